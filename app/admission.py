@@ -0,0 +1,118 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.metrics import registry
+
+# Route classes, from first to last shed
+LOW = "low"  # analytics, imports, time series: expensive and safe to retry later
+NORMAL = "normal"
+EXEMPT = "exempt"  # long-lived streams and probes; never counted or shed
+
+EWMA_ALPHA = 0.2
+
+admission_rejected = registry.counter(
+    "admission_rejected_total", "Requests shed with 503 by admission control", ("route_class", "reason")
+)
+
+
+class DecayingAverage:
+    """EWMA of observed values that also decays toward zero while nothing is observed.
+
+    Decay is by elapsed time (half_life_seconds), so a burst of slow pool checkouts stops
+    counting against admission once traffic that would sample it again has been shed.
+    """
+
+    def __init__(self, half_life_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.half_life_seconds = half_life_seconds
+        self._clock = clock
+        self._value = 0.0
+        self._at = clock()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        elapsed = max(0.0, now - self._at)
+        return self._value * math.pow(0.5, elapsed / self.half_life_seconds)
+
+    def observe(self, value: float) -> None:
+        now = self._clock()
+        with self._lock:
+            current = self._decayed(now)
+            self._value = current + EWMA_ALPHA * (value - current)
+            self._at = now
+
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(self._clock())
+
+
+# seconds spent waiting for a pooled connection (fed by app.db's pool)
+pool_wait = DecayingAverage(settings.admission_half_life_seconds)
+
+
+class AdmissionController:
+    def __init__(self, wait: DecayingAverage = pool_wait):
+        self._wait = wait
+        self._in_flight: Dict[str, int] = {LOW: 0, NORMAL: 0}
+        self._lock = threading.Lock()
+
+    def in_flight(self, route_class: Optional[str] = None) -> int:
+        with self._lock:
+            if route_class is None:
+                return sum(self._in_flight.values())
+            return self._in_flight.get(route_class, 0)
+
+    def saturation(self) -> Optional[str]:
+        """Why every non-exempt request is currently being shed ("pool_wait", "in_flight"), or None."""
+        if self._wait.value() * 1000 >= settings.admission_shed_wait_ms:
+            return "pool_wait"
+        if self.in_flight() >= settings.admission_max_in_flight:
+            return "in_flight"
+        return None
+
+    def try_admit(self, route_class: str) -> Tuple[bool, Optional[str]]:
+        """(admitted, reason). Admitted requests must call release(route_class) when done."""
+        wait_ms = self._wait.value() * 1000
+        with self._lock:
+            total = sum(self._in_flight.values())
+            reason = None
+            if total >= settings.admission_max_in_flight:
+                reason = "in_flight"
+            elif wait_ms >= settings.admission_shed_wait_ms:
+                reason = "pool_wait"
+            elif route_class == LOW:
+                # low-priority work backs off as soon as checkouts start queueing
+                if self._in_flight[LOW] >= settings.admission_low_max_in_flight:
+                    reason = "in_flight"
+                elif wait_ms >= settings.admission_low_wait_ms:
+                    reason = "pool_wait"
+
+            if reason is None:
+                self._in_flight[route_class] += 1
+
+        if reason is not None:
+            admission_rejected.inc(route_class, reason)
+            return False, reason
+        return True, None
+
+    def release(self, route_class: str) -> None:
+        with self._lock:
+            self._in_flight[route_class] -= 1
+
+
+controller = AdmissionController()
+
+registry.gauge("admission_in_flight", "Requests currently admitted (low + normal)", controller.in_flight)
+registry.gauge("db_pool_wait_seconds", "Decaying average wait for a pooled connection", pool_wait.value)
+
+
+def admission_class(route_class: str) -> Callable:
+    """Mark a route's class for admission control (routes are NORMAL unless marked)."""
+
+    def decorator(fn: Callable) -> Callable:
+        fn.admission_class = route_class
+        return fn
+
+    return decorator
@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+from typing import List
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.db import engine
+from app.models.analytics import MATERIALIZED_VIEWS
+
+logger = logging.getLogger(__name__)
+
+# advisory lock so only one worker/process refreshes at a time
+REFRESH_LOCK_KEY = 7_301_001
+
+
+def refresh_materialized_views() -> List[str]:
+    """Refresh every analytics view CONCURRENTLY, so readers are never blocked.
+
+    Returns the refreshed view names, or an empty list if another refresh holds the lock.
+    """
+    with engine.begin() as conn:
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        ).scalar()
+        if not acquired:
+            return []
+
+        for view in MATERIALIZED_VIEWS:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+
+    return [view.name for view in MATERIALIZED_VIEWS]
+
+
+async def refresh_periodically(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        started = time.monotonic()
+        try:
+            refreshed = await run_in_threadpool(refresh_materialized_views)
+        except Exception:
+            logger.exception("Analytics refresh failed")
+            continue
+
+        if refreshed:
+            logger.info(f"Refreshed {len(refreshed)} analytics views in {time.monotonic() - started:.2f}s")
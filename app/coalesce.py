@@ -0,0 +1,108 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import registry
+
+coalesce_leaders = registry.counter(
+    "coalesce_leader_total", "Coalescable calls that ran the computation", ("route",)
+)
+coalesce_followers = registry.counter(
+    "coalesce_coalesced_total", "Calls answered from an identical call already in flight", ("route",)
+)
+
+
+class SingleFlight:
+    """Runs a coroutine once per key at a time; concurrent callers with the same key share the outcome.
+
+    Nothing is cached: once the in-flight call finishes, the next caller computes afresh.
+    Waiting is done on the event loop, so followers hold no threadpool worker; callers must
+    share one loop (one SingleFlight per worker process).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        observe: Optional[Callable[[bool], None]] = None,
+    ) -> Any:
+        """fn()'s result; an exception from the computation is raised in every caller.
+
+        observe(shared) is called once per caller, before waiting. A caller that is cancelled
+        (e.g. its client went away) stops waiting without cancelling the shared computation.
+        """
+        call = self._calls.get(key)
+        leader = call is None
+        if leader:
+            call = self._calls[key] = asyncio.ensure_future(self._run(key, fn))
+            call.add_done_callback(_retrieve_exception)
+
+        if observe is not None:
+            observe(not leader)
+
+        return await asyncio.shield(call)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fn()
+        finally:
+            # before the result is published, so nobody joins a finished flight
+            del self._calls[key]
+
+
+def _retrieve_exception(call: "asyncio.Task") -> None:
+    # every caller may have gone away; don't log "exception was never retrieved" for it
+    if not call.cancelled():
+        call.exception()
+
+
+flights = SingleFlight()
+
+
+def _request_key(name: str, kwargs: Dict[str, Any]) -> Hashable:
+    params = []
+    use_replica = False
+    for param, value in sorted(kwargs.items()):
+        if isinstance(value, Session):
+            # replica and primary reads (read-your-writes) are not interchangeable
+            use_replica = bool(getattr(value, "use_replica", False))
+        elif not isinstance(value, (Request, Response)):
+            params.append((param, repr(value)))
+    return name, use_replica, tuple(params)
+
+
+def coalesce(fn: Callable) -> Callable:
+    """Opt a sync GET route into single-flight: identical concurrent calls share one computation.
+
+    The key is the route plus its normalized parameters (path/query values, not the raw URL).
+    Only use it on read-only routes whose result does not depend on who is asking and that
+    do not set headers on an injected Response (waiters only get the returned value).
+
+    The wrapped route becomes async: the leader runs fn in the threadpool, the rest wait on
+    the event loop, so a burst of identical requests costs one worker thread, not one each.
+    """
+    name = fn.__name__
+
+    def observe(shared: bool) -> None:
+        (coalesce_followers if shared else coalesce_leaders).inc(name)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not settings.coalesce_enabled:
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+        return await flights.do(
+            _request_key(name, kwargs),
+            lambda: run_in_threadpool(fn, *args, **kwargs),
+            observe,
+        )
+
+    return wrapper
@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,7 +11,106 @@ class Settings(BaseSettings):
     database_url: str
     api_key: str
 
-    rate_limit_per_minute: int = 30
+    # optional read replica for GET routes; clients that just wrote read from the primary
+    # for read_your_writes_seconds so they see their own changes. Across several workers or
+    # instances that needs the client to echo the X-Read-Primary-Until header (or keep the
+    # read_primary_until cookie); otherwise the pin only holds on the worker that took the write
+    database_replica_url: Optional[str] = None
+    read_your_writes_seconds: float = 5.0
+
+    # cost units per minute, shared by all routes (see COST_* in app/middleware/rate_limit.py).
+    # rate_limit_key_tiers maps sha256(api key) hex -> a tier name in rate_limit_tiers;
+    # keys without a tier get rate_limit_per_minute
+    rate_limit_per_minute: int = 120
+    rate_limit_tiers: Dict[str, int] = {"bulk": 1200}
+    rate_limit_key_tiers: Dict[str, str] = {}
+
+    # Idempotency-Key responses are replayable for this long; the hottest are also kept in memory
+    idempotency_ttl_seconds: int = 86400
+    idempotency_cache_size: int = 1024
+    # keyed POSTs are hashed from a buffered body, so larger ones (and bodies sent without a
+    # Content-Length, like streamed statement imports) pass through without a key
+    idempotency_max_body_bytes: int = 1024 * 1024
+
+    # fx_rates are stored as units of currency per 1 unit of this currency
+    fx_base_currency: str = "USD"
+    fx_cache_ttl_seconds: int = 300
+
+    # 0 disables the in-process schedule; POST /v1/analytics/refresh still works
+    analytics_refresh_interval_seconds: int = 0
+
+    # outbox webhook delivery (python -m app.webhooks run); events are signed with webhook_secret
+    webhook_url: Optional[str] = None
+    webhook_secret: Optional[str] = None
+    webhook_batch_size: int = 100
+    webhook_timeout_seconds: float = 10.0
+    webhook_poll_interval_seconds: float = 1.0
+    webhook_max_attempts: int = 12
+    webhook_backoff_base_seconds: float = 2.0
+    webhook_backoff_max_seconds: float = 3600.0
+    # outbox rows older than this are deleted whether or not they were delivered; the API
+    # process purges every outbox_purge_interval_seconds (0 = off; use python -m app.webhooks purge)
+    outbox_retention_days: int = 7
+    outbox_purge_interval_seconds: int = 3600
+
+    # live trip events (GET /v1/trips/{id}/events): "local" fans out within this process,
+    # "postgres" uses LISTEN/NOTIFY so writes on any worker reach every worker's subscribers
+    events_backend: str = "local"
+    sse_heartbeat_seconds: float = 15.0
+    sse_queue_size: int = 100
+
+    # server-side prepared statements (psycopg). Neon's pooler (PgBouncer with
+    # max_prepared_statements) supports them; turn off for poolers that do not
+    db_prepared_statements: bool = True
+    db_prepare_threshold: int = 5
+
+    # per-request Postgres timeouts (SET LOCAL on every transaction of a get_db session), in ms;
+    # 0 disables. The route maps override them by endpoint function name
+    db_statement_timeout_ms: int = 5000
+    db_lock_timeout_ms: int = 2000
+    db_route_statement_timeout_ms: Dict[str, int] = {
+        "list_spend_entries": 2000,
+        "import_spend_entries_file": 300000,
+    }
+    db_route_lock_timeout_ms: Dict[str, int] = {}
+
+    # admission control: shed LOW routes (analytics, imports, time series) once pool checkouts
+    # start waiting admission_low_wait_ms, and everything once they wait admission_shed_wait_ms
+    # (EWMA, decaying with admission_half_life_seconds) or admission_max_in_flight is reached
+    admission_enabled: bool = True
+    admission_max_in_flight: int = 64
+    admission_low_max_in_flight: int = 8
+    admission_low_wait_ms: float = 50.0
+    admission_shed_wait_ms: float = 1000.0
+    admission_half_life_seconds: float = 5.0
+    admission_retry_after_seconds: int = 2
+
+    # single-flight for @coalesce routes (trip summaries): identical concurrent GETs share one computation
+    coalesce_enabled: bool = True
+
+    # GET /v1/reservations?ids=... and /v1/spend-entries?ids=...
+    bulk_fetch_max_ids: int = 100
+
+    # POST /v1/batch: GET sub-requests run in-process through the full middleware stack,
+    # at most batch_max_concurrency at a time; each one counts against the caller's rate limits
+    batch_max_requests: int = 20
+    batch_max_concurrency: int = 5
+    batch_timeout_seconds: float = 10.0
+
+    # POST /v1/trips/{id}/spend-entries/import upload cap (the body is spooled to disk, not memory)
+    spend_import_max_bytes: int = 50 * 1024 * 1024
+
+    # reminder engine (python -m app.reminders run); offsets are minutes before start_at.
+    # reminder_sink is log|webhook|file; the webhook sink signs with webhook_secret
+    reminder_offsets_minutes: List[int] = [1440, 120]
+    reminder_sink: str = "log"
+    reminder_webhook_url: Optional[str] = None
+    reminder_file_path: str = "reminders.jsonl"
+    reminder_window_minutes: int = 15
+    reminder_refresh_seconds: int = 60
+    reminder_grace_minutes: int = 60
+    reminder_retry_seconds: int = 60
+    reminder_max_attempts: int = 5
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,14 +1,88 @@
+import threading
+import time
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from app.admission import pool_wait
 from app.config import settings
 
+
+class WaitTimingQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection (admission control).
+
+    Only queueing counts: time spent opening a new connection (TCP/TLS/auth, a cold Neon
+    compute) is subtracted, since it says nothing about pool contention.
+    """
+
+    # per thread: inside an outermost _do_get (QueuePool retries by recursing), and connect time
+    _timing = threading.local()
+    clock = time.perf_counter
+    wait_average = pool_wait
+
+    def _do_get(self):
+        if getattr(self._timing, "active", False):
+            return super()._do_get()
+
+        self._timing.active = True
+        self._timing.connecting = 0.0
+        started = self.clock()
+        try:
+            return super()._do_get()
+        finally:
+            waited = self.clock() - started - self._timing.connecting
+            self._timing.active = False
+            self.wait_average.observe(max(0.0, waited))
+
+    def _create_connection(self):
+        started = self.clock()
+        try:
+            return super()._create_connection()
+        finally:
+            if getattr(self._timing, "active", False):
+                self._timing.connecting += self.clock() - started
+
+
+def _connect_args() -> dict:
+    # psycopg prepares a statement server-side once it has run prepare_threshold times on a
+    # connection; None turns that off (for poolers without prepared-statement support)
+    return {
+        "connect_timeout": 5,
+        "prepare_threshold": settings.db_prepare_threshold if settings.db_prepared_statements else None,
+    }
+
+
 engine = create_engine(
     settings.database_url,
+    poolclass = WaitTimingQueuePool,
     pool_pre_ping = True,
-    connect_args = {"connect_timeout": 5}
+    connect_args = _connect_args()
 )
 
+# Optional read replica; GET traffic goes here unless the client recently wrote (see app.deps)
+replica_engine = None
+if settings.database_replica_url:
+    replica_engine = create_engine(
+        settings.database_replica_url,
+        poolclass = WaitTimingQueuePool,
+        pool_pre_ping = True,
+        connect_args = _connect_args()
+    )
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica when `use_replica` is set; flushes always hit the primary."""
+
+    use_replica = False
+
+    def get_bind(self, mapper = None, clause = None, **kw):
+        if self.use_replica and replica_engine is not None and not self._flushing:
+            return replica_engine
+        return super().get_bind(mapper = mapper, clause = clause, **kw)
+
+
 SessionLocal = sessionmaker(
+    class_ = RoutingSession,
     autocommit = False,
     autoflush = False,
     bind = engine
@@ -1,11 +1,184 @@
-from typing import Generator
+import math
+import threading
+import time
+from typing import Callable, Dict, Generator, List, Optional, Sequence
+
+from fastapi import Header, HTTPException, Query, Request, Response
+from slowapi.util import get_remote_address
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
+
+from app.config import settings
+from app.db import SessionLocal, replica_engine
+from app.middleware.rate_limit import rate_limit_key_func
+from app.query_budget import SESSION_INFO_KEY, route_timeouts
+
+SAFE_METHODS = {"GET", "HEAD"}
+
+# Read-your-writes pin handed to the client after a write (unix time until which its reads go to
+# the primary). Echoed back as this header or cookie it works across workers and instances
+PRIMARY_PIN_HEADER = "X-Read-Primary-Until"
+PRIMARY_PIN_COOKIE = "read_primary_until"
+
+# Fallback for clients that do not echo the pin: client -> monotonic deadline.
+# Per process, so it only helps when the next read lands on the same worker
+_primary_pins: Dict[str, float] = {}
+_primary_pins_lock = threading.Lock()
+
+
+def _client_key(request: Request) -> str:
+    return f"{rate_limit_key_func(request)}|{get_remote_address(request)}"
+
+
+def _pin_to_primary(request: Request) -> None:
+    now = time.monotonic()
+    with _primary_pins_lock:
+        if len(_primary_pins) > 10_000:
+            for key, deadline in list(_primary_pins.items()):
+                if deadline <= now:
+                    del _primary_pins[key]
+        _primary_pins[_client_key(request)] = now + settings.read_your_writes_seconds
 
 
-def get_db() -> Generator[Session, None, None]:
+def _client_pin_active(request: Request) -> bool:
+    raw = request.headers.get(PRIMARY_PIN_HEADER) or request.cookies.get(PRIMARY_PIN_COOKIE)
+    if not raw:
+        return False
+    try:
+        until = float(raw)
+    except ValueError:
+        return False
+    now = time.time()
+    # a pin can only ask for the usual window, not keep a client off the replica for good
+    return now < until <= now + settings.read_your_writes_seconds
+
+
+def _is_pinned_to_primary(request: Request) -> bool:
+    if _client_pin_active(request):
+        return True
+    with _primary_pins_lock:
+        deadline = _primary_pins.get(_client_key(request))
+    return deadline is not None and deadline > time.monotonic()
+
+
+def _hand_out_pin(response: Response) -> None:
+    until = f"{time.time() + settings.read_your_writes_seconds:.3f}"
+    response.headers[PRIMARY_PIN_HEADER] = until
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        until,
+        max_age=math.ceil(settings.read_your_writes_seconds),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def get_db(request: Request, response: Response) -> Generator[Session, None, None]:
     db = SessionLocal()
+    db.use_replica = (
+        replica_engine is not None
+        and request.method in SAFE_METHODS
+        and not _is_pinned_to_primary(request)
+    )
+    endpoint = request.scope.get("endpoint")
+    db.info[SESSION_INFO_KEY] = route_timeouts(getattr(endpoint, "__name__", None))
+    if replica_engine is not None and request.method not in SAFE_METHODS:
+        _hand_out_pin(response)
     try:
         yield db
     finally:
         db.close()
+        if request.method not in SAFE_METHODS:
+            _pin_to_primary(request)
+
+
+def if_match_version(if_match: Optional[str] = Header(default=None)) -> Optional[int]:
+    """Version from an If-Match header (an ETag from this API); None when absent or "*"."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+
+    # isascii(): str.isdigit() also accepts e.g. "²", which int() rejects
+    if not (value.isascii() and value.isdigit()):
+        raise HTTPException(status_code=400, detail="If-Match must be an ETag returned by this API")
+    return int(value)
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = f'"{version}"'
+
+
+def update_versioned(
+    db: Session,
+    model,
+    row_id: int,
+    values: dict,
+    expected_version: Optional[int],
+    label: str,
+    criteria: Sequence = (),
+    on_integrity_error: Optional[Callable[[IntegrityError], None]] = None,
+    explain_miss: Optional[Callable[[], None]] = None,
+):
+    """The write behind every PATCH: one conditional UPDATE ... RETURNING that bumps version.
+
+    No read before write and no row lock held across requests; If-Match and any extra criteria
+    ride along in the WHERE clause. The row comes back detached, so the caller's commit doesn't
+    expire the RETURNING values (which would cost a refresh round-trip).
+
+    When nothing matched: explain_miss() may raise something more specific, otherwise 404 if the
+    row is gone and 412 if its version moved. On an IntegrityError the session is rolled back
+    and on_integrity_error(e) gets a chance to raise; anything it doesn't handle is re-raised.
+    """
+    stmt = update(model).where(model.id == row_id, *criteria)
+    if expected_version is not None:
+        stmt = stmt.where(model.version == expected_version)
+
+    try:
+        row = db.execute(
+            stmt.values(**values, version=model.version + 1)
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+    except IntegrityError as e:
+        db.rollback()
+        if on_integrity_error is not None:
+            on_integrity_error(e)
+        raise
+
+    if row is None:
+        db.rollback()
+        if explain_miss is not None:
+            explain_miss()
+        if not db.query(model.id).filter(model.id == row_id).first():
+            raise HTTPException(status_code=404, detail=f"{label} not found")
+        raise HTTPException(status_code=412, detail=f"{label} was modified by another request")
+
+    db.expunge(row)
+    return row
+
+
+def bulk_ids(ids: str = Query(..., description="Comma-separated ids, e.g. 12,7,31")) -> List[int]:
+    """Distinct ids from ?ids=, in the order given, capped at bulk_fetch_max_ids."""
+    parsed: List[int] = []
+    seen = set()
+    for raw in ids.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if not (raw.isascii() and raw.isdigit()):
+            raise HTTPException(status_code=400, detail=f"ids must be comma-separated integers (got {raw!r})")
+        value = int(raw)
+        if value not in seen:
+            seen.add(value)
+            parsed.append(value)
+
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must contain at least one id")
+    if len(parsed) > settings.bulk_fetch_max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_fetch_max_ids} ids per request")
+    return parsed
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "trip_events"
+LISTEN_RETRY_SECONDS = 5
+
+# sent to a subscriber whose queue overflowed; it should resync via the change feed
+RESYNC = {"type": "resync"}
+
+
+class EventHub:
+    """In-process pub/sub of trip change events; one bounded asyncio.Queue per subscriber."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(self, trip_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[trip_id].add(queue)
+        return queue
+
+    def unsubscribe(self, trip_id: int, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(trip_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[trip_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, trip_id: int, message: Dict[str, Any]) -> None:
+        """Must run on the event loop thread."""
+        for queue in list(self._subscribers.get(trip_id, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # slow consumer: drop its backlog rather than buffer without bound
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def publish_threadsafe(self, trip_id: int, message: Dict[str, Any]) -> None:
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.publish, trip_id, message)
+
+
+hub = EventHub(settings.sse_queue_size)
+
+
+def _message(outbox_event: OutboxEvent) -> Dict[str, Any]:
+    # kept small (NOTIFY payloads max out at 8000 bytes); clients refetch what they display
+    return {
+        "event_id": outbox_event.id,
+        "type": outbox_event.event_type,
+        "trip_id": outbox_event.trip_id,
+        "aggregate_type": outbox_event.aggregate_type,
+        "aggregate_id": outbox_event.aggregate_id,
+        "version": (outbox_event.payload or {}).get("version"),
+    }
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_outbox_events(session, flush_context):
+    messages = [_message(obj) for obj in session.new if isinstance(obj, OutboxEvent) and obj.trip_id is not None]
+    if not messages:
+        return
+
+    if settings.events_backend == "postgres":
+        # NOTIFY is transactional: it is only delivered if this transaction commits
+        for message in messages:
+            session.connection().execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": json.dumps(message)},
+            )
+    else:
+        session.info.setdefault("pending_events", []).extend(messages)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_committed_events(session):
+    messages: List[Dict[str, Any]] = session.info.pop("pending_events", [])
+    for message in messages:
+        hub.publish_threadsafe(message["trip_id"], message)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _drop_rolled_back_events(session, previous_transaction):
+    session.info.pop("pending_events", None)
+
+
+def _listen_dsn() -> str:
+    # psycopg wants a plain libpq URL, not the SQLAlchemy "postgresql+psycopg" one
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def listen_for_notifications() -> None:
+    """Relay NOTIFYs from every worker into this process's hub; reconnects on failure."""
+    import psycopg
+
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(_listen_dsn(), autocommit=True) as conn:
+                await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                logger.info(f"Listening for {NOTIFY_CHANNEL} notifications")
+                async for notify in conn.notifies():
+                    message = json.loads(notify.payload)
+                    hub.publish(message["trip_id"], message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Event listener connection failed; retrying")
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
@@ -0,0 +1,150 @@
+import argparse
+import csv
+import logging
+import threading
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fx_rate import FxRate
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 1000
+
+
+class FxRateCache:
+    """Process-local snapshot of the latest rate per currency, refreshed every ttl_seconds."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Decimal] = {}
+        self._loaded_at: Optional[float] = None
+
+    def latest_rates(self, db: Session) -> Dict[str, Decimal]:
+        with self._lock:
+            fresh = self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+            if fresh:
+                return self._latest
+
+        rows = db.execute(
+            select(FxRate.currency, FxRate.rate)
+            .distinct(FxRate.currency)
+            .order_by(FxRate.currency, FxRate.rate_date.desc())
+        ).all()
+
+        latest = {currency: rate for currency, rate in rows}
+        latest[settings.fx_base_currency] = Decimal(1)
+
+        with self._lock:
+            self._latest = latest
+            self._loaded_at = time.monotonic()
+        return latest
+
+    def has_currency(self, db: Session, currency: str) -> bool:
+        return currency in self.latest_rates(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+
+rate_cache = FxRateCache(settings.fx_cache_ttl_seconds)
+
+
+def _rate_on(currency, day):
+    """SQL expression for `currency`'s most recent rate on or before `day` (NULL if none)."""
+    if isinstance(currency, str):
+        if currency == settings.fx_base_currency:
+            return literal(Decimal(1))
+        currency = literal(currency)
+
+    # served by the fx_rates (currency, rate_date) primary key
+    latest = (
+        select(FxRate.rate)
+        .where(FxRate.currency == currency, FxRate.rate_date <= day)
+        .order_by(FxRate.rate_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case((currency == settings.fx_base_currency, literal(Decimal(1))), else_=latest)
+
+
+def converted_amount(amount, currency, day, target: str):
+    """SQL expression converting `amount` in `currency` to `target` at the rates for `day`.
+
+    NULL when either rate is missing, so callers can count unconverted rows.
+    """
+    return amount * _rate_on(target, day) / _rate_on(currency, day)
+
+
+def _parse_row(row: Dict[str, str], line_no: int) -> dict:
+    try:
+        rate = Decimal(row["rate"].strip())
+        if rate <= 0:
+            raise InvalidOperation
+        return {
+            "rate_date": date.fromisoformat(row["date"].strip()),
+            "currency": row["currency"].strip().upper(),
+            "rate": rate,
+        }
+    except (KeyError, ValueError, InvalidOperation, AttributeError):
+        raise ValueError(f"line {line_no}: expected date,currency,rate with a positive rate, got {row}")
+
+
+def _upsert(db: Session, batch: List[dict]) -> None:
+    stmt = insert(FxRate).values(batch)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[FxRate.currency, FxRate.rate_date],
+            set_={"rate": stmt.excluded.rate},
+        )
+    )
+
+
+def load_rates_csv(db: Session, path: str) -> int:
+    """Upsert rates from a CSV with a date,currency,rate header (rate = units per 1 base currency)."""
+    loaded = 0
+    batch: List[dict] = []
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            batch.append(_parse_row(row, line_no))
+            if len(batch) >= LOAD_BATCH_SIZE:
+                _upsert(db, batch)
+                loaded += len(batch)
+                batch = []
+
+    if batch:
+        _upsert(db, batch)
+        loaded += len(batch)
+
+    db.commit()
+    rate_cache.invalidate()
+    return loaded
+
+
+def main() -> None:
+    from app.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Manage the local fx_rates table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="Load dated rates from a CSV file (date,currency,rate)")
+    load.add_argument("path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        loaded = load_rates_csv(db, args.path)
+    logger.info(f"Loaded {loaded} FX rates (base {settings.fx_base_currency})")
+
+
+if __name__ == "__main__":
+    main()
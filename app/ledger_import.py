@@ -0,0 +1,350 @@
+import codecs
+import csv
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.outbox_event import OutboxEvent
+from app.timezones import get_zone
+
+IMPORT_ERROR_LIMIT = 100
+UNMATCHED_CATEGORY_LIMIT = 20
+READ_CHUNK_SIZE = 64 * 1024
+
+# CSV header aliases (case-insensitive) -> staging field
+CSV_COLUMNS = {
+    "occurred_at": ("occurred_at", "date", "posted", "transaction_date"),
+    "amount": ("amount",),
+    "currency": ("currency",),
+    "description": ("description", "payee", "name", "memo"),
+    "category": ("category",),
+    "notes": ("notes",),
+    "external_id": ("id", "transaction_id", "reference", "fitid"),
+}
+
+# (line_no, occurred_at, amount, currency, description, category_name, notes, content_hash)
+StagingRow = Tuple[int, datetime, Decimal, str, Optional[str], Optional[str], Optional[str], str]
+
+_AMOUNT_JUNK = re.compile(r"[\s,$€£¥]")
+_OFX_DATE = re.compile(r"^(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?")
+
+
+class ImportErrors:
+    """Counts every invalid row but keeps only the first few messages (flat memory)."""
+
+    def __init__(self, limit: int = IMPORT_ERROR_LIMIT):
+        self.limit = limit
+        self.count = 0
+        self.items: List[Dict] = []
+
+    def add(self, line: int, message: str) -> None:
+        self.count += 1
+        if len(self.items) < self.limit:
+            self.items.append({"line": line, "message": message})
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def _parse_amount(raw: Optional[str], negate: bool) -> Decimal:
+    cleaned = _AMOUNT_JUNK.sub("", raw or "")
+    # accounting style negatives: (12.34)
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = "-" + cleaned[1:-1]
+    try:
+        amount = Decimal(cleaned)
+        if not amount.is_finite():
+            raise InvalidOperation
+        # quantize raises InvalidOperation when the cents don't fit the context (e.g. 1e400)
+        return (-amount if negate else amount).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError("amount is not a number")
+
+
+def _parse_csv_datetime(raw: Optional[str], tz: str) -> datetime:
+    raw = (raw or "").strip()
+    if raw.endswith("Z"):
+        raw = raw[:-1] + "+00:00"
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, "%m/%d/%Y")):
+        try:
+            at = parse(raw)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError("date is not ISO 8601 (YYYY-MM-DD[THH:MM]) or MM/DD/YYYY")
+
+    # date-only / naive values are local to the statement's timezone
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=get_zone(tz))
+    return at
+
+
+def _parse_ofx_datetime(raw: Optional[str]) -> datetime:
+    match = _OFX_DATE.match((raw or "").strip())
+    if not match:
+        raise ValueError("DTPOSTED is not an OFX date")
+    day, clock, offset = match.groups()
+    at = datetime.strptime(day + (clock or "000000"), "%Y%m%d%H%M%S")
+    return at.replace(tzinfo=timezone(timedelta(hours=float(offset or 0))))
+
+
+def _content_hash(external_id, occurred_at: datetime, amount: Decimal, currency: str, description) -> str:
+    identity = "|".join(
+        [
+            external_id or "",
+            occurred_at.astimezone(timezone.utc).isoformat(),
+            f"{amount:.2f}",
+            currency,
+            description or "",
+        ]
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def _staging_row(line: int, fields: Dict[str, Optional[str]], occurred_at: datetime, amount: Decimal, default_currency: str) -> StagingRow:
+    currency = (_clean(fields.get("currency")) or default_currency).upper()
+    description = _clean(fields.get("description"))
+    return (
+        line,
+        occurred_at,
+        amount,
+        currency,
+        description,
+        _clean(fields.get("category")),
+        _clean(fields.get("notes")),
+        _content_hash(_clean(fields.get("external_id")), occurred_at, amount, currency, description),
+    )
+
+
+def _text_stream(raw: IO[bytes]):
+    # utf-8-sig drops the BOM spreadsheet exports like to add
+    return codecs.getreader("utf-8-sig")(raw, errors="replace")
+
+
+def _csv_records(reader) -> Iterator[List[str]]:
+    """The reader's records, with csv.Error (e.g. a field over the size limit) as a ValueError naming the line."""
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise ValueError(f"CSV is malformed at line {reader.line_num}: {e}")
+
+
+def parse_csv(raw: IO[bytes], default_currency: str, tz: str, negate: bool, errors: ImportErrors) -> Iterator[StagingRow]:
+    reader = csv.reader(_text_stream(raw))
+    records = _csv_records(reader)
+    header = next(records, None)
+    if header is None:
+        return
+
+    positions: Dict[str, int] = {}
+    normalized = [h.strip().lower() for h in header]
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+
+    missing = [f for f in ("occurred_at", "amount") if f not in positions]
+    if missing:
+        raise ValueError(f"CSV header is missing required column(s): {', '.join(missing)}")
+
+    for values in records:
+        line = reader.line_num
+        if not any(v.strip() for v in values):
+            continue
+
+        fields = {field: (values[i] if i < len(values) else None) for field, i in positions.items()}
+        try:
+            occurred_at = _parse_csv_datetime(fields["occurred_at"], tz)
+            amount = _parse_amount(fields["amount"], negate)
+        except ValueError as e:
+            errors.add(line, str(e))
+            continue
+
+        yield _staging_row(line, fields, occurred_at, amount, default_currency)
+
+
+def _ofx_tokens(raw: IO[bytes]) -> Iterator[Tuple[str, str]]:
+    """(TAG, value) pairs from SGML or XML OFX, read a chunk at a time."""
+    stream = _text_stream(raw)
+    buffer = ""
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = (buffer + chunk).split("<")
+        buffer = parts.pop()  # may be cut mid-tag; finish it with the next chunk
+        for part in parts:
+            tag, sep, value = part.partition(">")
+            if sep:
+                yield tag.strip().upper(), value.strip()
+
+    tag, sep, value = buffer.partition(">")
+    if sep:
+        yield tag.strip().upper(), value.strip()
+
+
+def parse_ofx(raw: IO[bytes], default_currency: str, negate: bool, errors: ImportErrors) -> Iterator[StagingRow]:
+    currency = default_currency
+    transaction: Optional[Dict[str, str]] = None
+    number = 0
+
+    for tag, value in _ofx_tokens(raw):
+        if tag == "CURDEF" and value:
+            currency = value
+        elif tag == "STMTTRN":
+            transaction = {}
+            number += 1
+        elif tag == "/STMTTRN" and transaction is not None:
+            fields = {
+                "currency": transaction.get("CURRENCY") or currency,
+                "description": transaction.get("NAME") or transaction.get("MEMO"),
+                "notes": transaction.get("MEMO") if transaction.get("NAME") else None,
+                "external_id": transaction.get("FITID"),
+            }
+            try:
+                occurred_at = _parse_ofx_datetime(transaction.get("DTPOSTED"))
+                amount = _parse_amount(transaction.get("TRNAMT"), negate)
+            except ValueError as e:
+                errors.add(number, str(e))
+            else:
+                yield _staging_row(number, fields, occurred_at, amount, default_currency)
+            transaction = None
+        elif transaction is not None and not tag.startswith("/"):
+            transaction[tag] = value
+
+
+def import_spend_entries(db: Session, trip_id: int, rows: Iterator[StagingRow], errors: ImportErrors) -> Dict:
+    """COPY parsed rows into a temp staging table, then validate, map and insert in set-based SQL."""
+    db.execute(
+        text(
+            """
+            CREATE TEMP TABLE spend_import_staging (
+                line_no integer NOT NULL,
+                occurred_at timestamptz NOT NULL,
+                amount numeric NOT NULL,
+                currency text NOT NULL,
+                description text,
+                category_name text,
+                notes text,
+                content_hash text NOT NULL
+            ) ON COMMIT DROP
+            """
+        )
+    )
+
+    rows_read = 0
+    cursor = db.connection().connection.cursor()
+    with cursor.copy(
+        "COPY spend_import_staging "
+        "(line_no, occurred_at, amount, currency, description, category_name, notes, content_hash) FROM STDIN"
+    ) as copy:
+        for row in rows:
+            copy.write_row(row)
+            rows_read += 1
+
+    # Row rules mirror SpendEntryCreate / the spend_entries constraints
+    invalid_rule = """
+        CASE
+            WHEN s.amount < 0 THEN 'amount must be >= 0 (use negate=true for statements that record spend as negative)'
+            WHEN s.amount >= 10000000000 THEN 'amount is too large'
+            WHEN s.currency !~ '^[A-Z]{3}$' THEN 'currency must be a 3-letter code'
+            WHEN length(s.description) > 200 THEN 'description is longer than 200 characters'
+        END
+    """
+    parse_errors = errors.count
+    invalid_rows = db.execute(
+        text(f"SELECT count(*) FROM spend_import_staging s WHERE {invalid_rule} IS NOT NULL")
+    ).scalar_one()
+    if invalid_rows:
+        first_invalid = db.execute(
+            text(
+                f"""
+                SELECT s.line_no, {invalid_rule} AS reason
+                FROM spend_import_staging s
+                WHERE {invalid_rule} IS NOT NULL
+                ORDER BY s.line_no
+                LIMIT :limit
+                """
+            ),
+            {"limit": errors.limit},
+        ).all()
+        for row in first_invalid:
+            errors.add(row.line_no, row.reason)
+        errors.count = parse_errors + invalid_rows
+
+    unmatched = db.execute(
+        text(
+            """
+            SELECT DISTINCT s.category_name
+            FROM spend_import_staging s
+            WHERE s.category_name IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM budget_categories bc
+                  WHERE bc.trip_id = :trip_id AND bc.name = s.category_name
+              )
+            ORDER BY s.category_name
+            LIMIT :limit
+            """
+        ),
+        {"trip_id": trip_id, "limit": UNMATCHED_CATEGORY_LIMIT},
+    ).scalars().all()
+
+    # Insert + outbox events in one statement; already-imported lines hit the
+    # ux_spend_entries_trip_content_hash index and are skipped
+    inserted = db.execute(
+        text(
+            f"""
+            WITH inserted AS (
+                INSERT INTO spend_entries
+                    (trip_id, category_id, amount, currency, occurred_at, description, notes, content_hash)
+                SELECT :trip_id, bc.id, s.amount, s.currency, s.occurred_at, s.description, s.notes, s.content_hash
+                FROM spend_import_staging s
+                LEFT JOIN budget_categories bc ON bc.trip_id = :trip_id AND bc.name = s.category_name
+                WHERE {invalid_rule} IS NULL
+                ORDER BY s.line_no
+                ON CONFLICT (trip_id, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+                RETURNING *
+            ),
+            events AS (
+                INSERT INTO outbox_events (trip_id, aggregate_type, aggregate_id, event_type, payload)
+                SELECT trip_id, 'spend_entry', id, 'spend_entry.created', to_jsonb(inserted) - 'search_vector'
+                FROM inserted
+            )
+            SELECT count(*) FROM inserted
+            """
+        ),
+        {"trip_id": trip_id},
+    ).scalar_one()
+
+    if inserted:
+        # one summary event for live subscribers (per-row events are above)
+        db.add(
+            OutboxEvent(
+                trip_id=trip_id,
+                aggregate_type="trip",
+                aggregate_id=trip_id,
+                event_type="spend_entry.imported",
+                payload={"inserted": inserted},
+            )
+        )
+
+    db.commit()
+
+    return {
+        "trip_id": trip_id,
+        "rows_read": rows_read + parse_errors,
+        "inserted": inserted,
+        "duplicates": rows_read - invalid_rows - inserted,
+        "invalid": errors.count,
+        "unmatched_categories": unmatched,
+        "errors": errors.items,
+    }
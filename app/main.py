@@ -1,15 +1,32 @@
+import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+from app.admission import controller, pool_wait
+from app.analytics import refresh_periodically
 from app.config import settings
-from app.db import engine
-from app.middleware.rate_limit import limiter
+from app.db import engine, replica_engine
+from app.events import hub, listen_for_notifications
+from app.middleware.admission import AdmissionControlMiddleware
+from app.metrics import registry
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.rate_limit import RateLimitHeadersMiddleware, limiter
+from app.outbox import purge_periodically
+from app.query_budget import query_timeout_handler
+from app.routes.analytics import router as analytics_router
+from app.routes.batch import router as batch_router
+from app.routes.budget_categories import router as budget_categories_router
+from app.routes.changes import router as changes_router
+from app.routes.events import router as events_router
 from app.routes.reservations import router as reservations_router
+from app.routes.search import router as search_router
 from app.routes.spend_entries import router as spend_entries_router
 from app.routes.trips import router as trips_router
 
@@ -26,18 +43,83 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+
+# statement_timeout / lock_timeout aborts (both OperationalError) become 504 / 503 instead of 500
+app.add_exception_handler(OperationalError, query_timeout_handler)
+
+# Idempotency-Key replays (so a replay never re-enters the route)
+app.add_middleware(IdempotencyMiddleware)
 
 # Routers
-app.include_router(trips_router)
-app.include_router(reservations_router)
-app.include_router(spend_entries_router)
+routers = [
+    trips_router,
+    reservations_router,
+    budget_categories_router,
+    spend_entries_router,
+    search_router,
+    analytics_router,
+    changes_router,
+    events_router,
+    batch_router,
+]
+for router in routers:
+    app.include_router(router)
 
+# Load shedding (outermost, so a rejected request costs no database work at all)
+app.add_middleware(AdmissionControlMiddleware, routers=routers)
 
 @app.on_event("startup")
 def startup_event():
     logger.info(f"Starting {settings.app_name} in {settings.environment} mode")
 
 
+@app.on_event("startup")
+async def start_analytics_refresh():
+    if settings.analytics_refresh_interval_seconds > 0:
+        app.state.analytics_refresh_task = asyncio.create_task(
+            refresh_periodically(settings.analytics_refresh_interval_seconds)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_analytics_refresh():
+    task = getattr(app.state, "analytics_refresh_task", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.on_event("startup")
+async def start_outbox_purge():
+    # runs without a webhook worker too: every write appends to the outbox
+    if settings.outbox_purge_interval_seconds > 0:
+        app.state.outbox_purge_task = asyncio.create_task(
+            purge_periodically(settings.outbox_purge_interval_seconds)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_outbox_purge():
+    task = getattr(app.state, "outbox_purge_task", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.on_event("startup")
+async def start_event_hub():
+    # routes run in the threadpool; committed events are handed to the loop thread-safely
+    hub.bind(asyncio.get_running_loop())
+    if settings.events_backend == "postgres":
+        app.state.event_listener_task = asyncio.create_task(listen_for_notifications())
+
+
+@app.on_event("shutdown")
+async def stop_event_hub():
+    task = getattr(app.state, "event_listener_task", None)
+    if task is not None:
+        task.cancel()
+
+
 @app.get("/health")
 def health():
     return {
@@ -47,11 +129,30 @@ def health():
 
 
 @app.get("/ready")
-def ready():
+def ready(response: Response):
+    load = {"pool_wait_ms": round(pool_wait.value() * 1000, 1), "in_flight": controller.in_flight()}
+
+    # saturated means admission control is shedding everything: take this instance out of rotation
+    # without queueing a SELECT 1 behind the requests already waiting for a connection
+    saturated = controller.saturation()
+    if saturated:
+        response.status_code = 503
+        return {"ready": False, "saturated": saturated, **load}
+
     try:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
-        return {"ready": True}
+        if replica_engine is not None:
+            with replica_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        return {"ready": True, **load}
     except Exception as e:
         logger.exception("DB readiness check failed")
-        return {"ready": False, "error": str(e)}
+        response.status_code = 503
+        return {"ready": False, "error": str(e), **load}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text format; like /health, unauthenticated so scrapers need no API key
+    return registry.render()
@@ -0,0 +1,57 @@
+from typing import Iterable, List, Tuple
+
+from fastapi import APIRouter
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+from app.admission import EXEMPT, NORMAL, controller
+from app.config import settings
+
+# unauthenticated probes and scrapers must answer even (especially) when saturated
+EXEMPT_PATHS = {"/health", "/ready", "/metrics"}
+
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """Sheds load with 503 + Retry-After when the database pool is saturated, low-priority routes first.
+
+    Route classes come from @admission_class on the endpoints of `routers`; routing has not
+    happened yet when this runs, so the middleware matches those routes itself.
+    """
+
+    def __init__(self, app, routers: Iterable[APIRouter] = ()):
+        super().__init__(app)
+        self._marked: List[Tuple[object, str]] = [
+            (route, route.endpoint.admission_class)
+            for router in routers
+            for route in router.routes
+            if hasattr(getattr(route, "endpoint", None), "admission_class")
+        ]
+
+    def _route_class(self, request: Request) -> str:
+        if request.url.path in EXEMPT_PATHS:
+            return EXEMPT
+        for route, route_class in self._marked:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return route_class
+        return NORMAL
+
+    async def dispatch(self, request: Request, call_next):
+        route_class = self._route_class(request)
+        if route_class == EXEMPT or not settings.admission_enabled:
+            return await call_next(request)
+
+        admitted, reason = controller.try_admit(route_class)
+        if not admitted:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": f"Server is busy ({reason}); retry shortly"},
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+
+        try:
+            return await call_next(request)
+        finally:
+            controller.release(route_class)
@@ -0,0 +1,293 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.config import settings
+from app.db import SessionLocal
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# a claim with no stored response after this long is treated as abandoned (e.g. worker crashed)
+IN_FLIGHT_TIMEOUT_SECONDS = 60
+PURGE_INTERVAL_SECONDS = 600
+PURGE_BATCH_SIZE = 500
+
+# response headers a replay repeats (the read-your-writes pin and its cookie included);
+# per-request ones such as RateLimit-* are left out
+REPLAYED_HEADERS = {"etag", "location", "set-cookie", "x-read-primary-until"}
+
+# (request_hash, status_code, content_type, body, expires_at, [[header, value], ...])
+StoredResponse = Tuple[str, int, Optional[str], str, datetime, List[List[str]]]
+
+
+class _HotCache:
+    """Small LRU of completed responses, so hot retries skip the database entirely."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: Tuple[str, str]) -> Optional[StoredResponse]:
+        with self._lock:
+            item = self._items.get(cache_key)
+            if item is None:
+                return None
+            if item[4] <= datetime.now(timezone.utc):
+                del self._items[cache_key]
+                return None
+            self._items.move_to_end(cache_key)
+            return item
+
+    def put(self, cache_key: Tuple[str, str], item: StoredResponse) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[cache_key] = item
+            self._items.move_to_end(cache_key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+hot_cache = _HotCache(settings.idempotency_cache_size)
+_last_purge = 0.0
+
+
+def _claim(scope: str, key: str, method: str, path: str, request_hash: str):
+    """Claim the key for this request.
+
+    Returns ("claimed", None), ("in_flight", None) or ("done", StoredResponse).
+    """
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.idempotency_ttl_seconds)
+
+    with SessionLocal() as db:
+        # Takes over expired keys and abandoned in-flight claims in the same statement
+        claimed = db.execute(
+            text(
+                """
+                INSERT INTO idempotency_keys (scope, key, method, path, request_hash, expires_at)
+                VALUES (:scope, :key, :method, :path, :request_hash, :expires_at)
+                ON CONFLICT (scope, key) DO UPDATE SET
+                    method = EXCLUDED.method,
+                    path = EXCLUDED.path,
+                    request_hash = EXCLUDED.request_hash,
+                    status_code = NULL,
+                    content_type = NULL,
+                    response_body = NULL,
+                    created_at = now(),
+                    expires_at = EXCLUDED.expires_at
+                WHERE idempotency_keys.expires_at < now()
+                   OR (idempotency_keys.status_code IS NULL
+                       AND idempotency_keys.created_at < now() - make_interval(secs => :in_flight_timeout))
+                RETURNING id
+                """
+            ),
+            {
+                "scope": scope,
+                "key": key,
+                "method": method,
+                "path": path,
+                "request_hash": request_hash,
+                "expires_at": expires_at,
+                "in_flight_timeout": IN_FLIGHT_TIMEOUT_SECONDS,
+            },
+        ).first()
+        db.commit()
+
+        if claimed:
+            _maybe_purge(db)
+            return "claimed", None
+
+        row = db.execute(
+            text(
+                """
+                SELECT request_hash, status_code, content_type, response_body, expires_at, response_headers
+                FROM idempotency_keys
+                WHERE scope = :scope AND key = :key
+                """
+            ),
+            {"scope": scope, "key": key},
+        ).first()
+
+    if row is None or row.status_code is None:
+        return "in_flight", None
+
+    return "done", (
+        row.request_hash,
+        row.status_code,
+        row.content_type,
+        row.response_body,
+        row.expires_at,
+        row.response_headers or [],
+    )
+
+
+def _store(
+    scope: str, key: str, status_code: int, content_type: Optional[str], body: str, headers: List[List[str]]
+) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            text(
+                """
+                UPDATE idempotency_keys
+                SET status_code = :status_code, content_type = :content_type, response_body = :body,
+                    response_headers = CAST(:headers AS jsonb)
+                WHERE scope = :scope AND key = :key
+                """
+            ),
+            {
+                "scope": scope,
+                "key": key,
+                "status_code": status_code,
+                "content_type": content_type,
+                "body": body,
+                "headers": json.dumps(headers),
+            },
+        )
+        db.commit()
+
+
+def _release(scope: str, key: str) -> None:
+    # Failed requests are not replayed; drop the claim so the client can retry for real
+    with SessionLocal() as db:
+        db.execute(
+            text("DELETE FROM idempotency_keys WHERE scope = :scope AND key = :key AND status_code IS NULL"),
+            {"scope": scope, "key": key},
+        )
+        db.commit()
+
+
+def _maybe_purge(db) -> None:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = now
+
+    db.execute(
+        text(
+            """
+            DELETE FROM idempotency_keys
+            WHERE id IN (SELECT id FROM idempotency_keys WHERE expires_at < now() LIMIT :batch)
+            """
+        ),
+        {"batch": PURGE_BATCH_SIZE},
+    )
+    db.commit()
+
+
+def _body_size_ok(request: Request) -> bool:
+    """True when the body is small enough to buffer and hash (see idempotency_max_body_bytes)."""
+    length = request.headers.get("content-length")
+    if length is None:
+        return False
+    try:
+        return int(length) <= settings.idempotency_max_body_bytes
+    except ValueError:
+        return False
+
+
+def _replayed_headers(response: Response) -> List[List[str]]:
+    return [
+        [name.decode("latin-1"), value.decode("latin-1")]
+        for name, value in response.raw_headers
+        if name.decode("latin-1").lower() in REPLAYED_HEADERS
+    ]
+
+
+def _replay(stored: StoredResponse, request_hash: str) -> Response:
+    stored_hash, status_code, content_type, body, _, headers = stored
+    if stored_hash != request_hash:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"{HEADER} was already used with a different request"},
+        )
+
+    response = Response(content=body, status_code=status_code, media_type=content_type)
+    for name, value in headers:
+        response.headers.append(name, value)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """Replays the stored response for POSTs retried with the same Idempotency-Key."""
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or not key:
+            return await call_next(request)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(status_code=400, content={"detail": f"{HEADER} is too long"})
+
+        # Only authenticated callers get to write claims; everything else falls through to a 401
+        auth_header = request.headers.get("Authorization", "")
+        api_key = auth_header[7:].strip() if auth_header.lower().startswith("bearer ") else ""
+        # bytes: compare_digest rejects non-ASCII str, and headers arrive decoded as latin-1
+        if not hmac.compare_digest(api_key.encode("latin-1"), settings.api_key.encode()):
+            return await call_next(request)
+
+        # Large or streamed bodies (the statement import) are never buffered here; the import
+        # skips already-imported lines on its own, so a retry is still safe
+        if not _body_size_ok(request):
+            return await call_next(request)
+
+        scope = hashlib.sha256(api_key.encode()).hexdigest()
+        body = await request.body()
+        request_hash = hashlib.sha256(
+            b"\n".join([request.method.encode(), request.url.path.encode(), request.url.query.encode(), body])
+        ).hexdigest()
+
+        cache_key = (scope, key)
+        cached = hot_cache.get(cache_key)
+        if cached is not None:
+            return _replay(cached, request_hash)
+
+        state, stored = await run_in_threadpool(
+            _claim, scope, key, request.method, request.url.path[:255], request_hash
+        )
+        if state == "done":
+            hot_cache.put(cache_key, stored)
+            return _replay(stored, request_hash)
+        if state == "in_flight":
+            return JSONResponse(
+                status_code=409,
+                content={"detail": f"A request with this {HEADER} is still in progress"},
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            response = await call_next(request)
+            response_body = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception:
+            await run_in_threadpool(_release, scope, key)
+            raise
+
+        if 200 <= response.status_code < 300:
+            content_type = response.headers.get("content-type")
+            decoded = response_body.decode("utf-8")
+            headers = _replayed_headers(response)
+            await run_in_threadpool(_store, scope, key, response.status_code, content_type, decoded, headers)
+
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.idempotency_ttl_seconds)
+            hot_cache.put(cache_key, (request_hash, response.status_code, content_type, decoded, expires_at, headers))
+        else:
+            await run_in_threadpool(_release, scope, key)
+
+        # raw_headers, not dict(headers): repeated headers such as Set-Cookie must all survive
+        buffered = Response(content=response_body, status_code=response.status_code)
+        buffered.raw_headers = list(response.raw_headers)
+        return buffered
@@ -1,9 +1,24 @@
+import hashlib
+import time
+from typing import Callable, Union
+
+from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.config import settings
 
+# Route cost weights, charged against one per-key budget shared by every route
+COST_READ = 1  # single rows, small lists, stream connects
+COST_LIST = 2  # paged lists, change feed, bulk fetch
+COST_WRITE = 2
+COST_AGGREGATE = 5  # summaries, itinerary, conflicts, time series, search, analytics
+COST_BULK = 20  # statement import, materialized view refresh
+
+BUDGET_SCOPE = "api"
+BUDGET_WINDOW_SECONDS = 60
+
 
 def rate_limit_key_func(request: Request) -> str:
     auth_header = request.headers.get("Authorization", "")
@@ -13,7 +28,49 @@ def rate_limit_key_func(request: Request) -> str:
     return get_remote_address(request)
 
 
+def budget_per_minute(key: str) -> int:
+    # tiers are assigned by sha256(api key), so config never holds the key itself
+    tier = settings.rate_limit_key_tiers.get(hashlib.sha256(key.encode()).hexdigest())
+    if tier is not None and tier in settings.rate_limit_tiers:
+        return settings.rate_limit_tiers[tier]
+    return settings.rate_limit_per_minute
+
+
+def _budget_limit(key: str) -> str:
+    return f"{budget_per_minute(key)}/minute"
+
+
+# Routes opt in with @limit_cost; there are no default limits, because slowapi also applies
+# defaults to routes whose limit is computed per key, which would charge those twice
 limiter = Limiter(
     key_func = rate_limit_key_func,
-    default_limits = [f"{settings.rate_limit_per_minute}/minute"]
+    strategy = "moving-window",
 )
+
+
+def limit_cost(cost: Union[int, Callable[[Request], int]]):
+    """Charge `cost` units (or cost(request)) of the caller's per-minute budget."""
+    return limiter.shared_limit(_budget_limit, scope = BUDGET_SCOPE, cost = cost)
+
+
+class RateLimitHeadersMiddleware(BaseHTTPMiddleware):
+    """Adds RateLimit-Limit/Remaining/Reset/Policy (and Retry-After on 429) for budgeted routes."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        current = getattr(request.state, "view_rate_limit", None)
+        if current is None or not limiter.enabled:
+            return response
+
+        item, args = current
+        reset_at, remaining = limiter.limiter.get_window_stats(item, *args)
+        reset_in = max(0, int(reset_at - time.time()))
+
+        response.headers["RateLimit-Limit"] = str(item.amount)
+        response.headers["RateLimit-Remaining"] = str(remaining)
+        response.headers["RateLimit-Reset"] = str(reset_in)
+        response.headers["RateLimit-Policy"] = f"{item.amount};w={BUDGET_WINDOW_SECONDS}"
+        if response.status_code == 429:
+            response.headers["Retry-After"] = str(max(1, reset_in))
+        return response
@@ -1,4 +1,10 @@
 from app.models.trip import Trip
 from app.models.reservation import Reservation
+from app.models.budget_category import BudgetCategory
+from app.models.spend_entry import SpendEntry
+from app.models.fx_rate import FxRate
+from app.models.idempotency_key import IdempotencyKey
+from app.models.outbox_event import OutboxEvent
+from app.models.reservation_reminder import ReservationReminder
 
 __all__ = ["Trip"]
@@ -0,0 +1,38 @@
+from sqlalchemy import BigInteger, Column, Date, MetaData, Numeric, String, Table
+
+# Materialized views are created by migrations, not by the ORM. They live on their own
+# MetaData so Alembic autogenerate never tries to create them as tables.
+analytics_metadata = MetaData()
+
+
+spend_by_month = Table(
+    "mv_spend_by_month",
+    analytics_metadata,
+    Column("month", Date, primary_key=True),
+    Column("currency", String(3), primary_key=True),
+    Column("total", Numeric(14, 2)),
+    Column("entries", BigInteger),
+    Column("trips", BigInteger),
+)
+
+spend_by_category = Table(
+    "mv_spend_by_category",
+    analytics_metadata,
+    Column("category_name", String(80), primary_key=True),
+    Column("currency", String(3), primary_key=True),
+    Column("total", Numeric(14, 2)),
+    Column("entries", BigInteger),
+    Column("trips", BigInteger),
+)
+
+spend_by_destination = Table(
+    "mv_spend_by_destination",
+    analytics_metadata,
+    Column("destination", String, primary_key=True),
+    Column("currency", String(3), primary_key=True),
+    Column("total", Numeric(14, 2)),
+    Column("entries", BigInteger),
+    Column("trips", BigInteger),
+)
+
+MATERIALIZED_VIEWS = (spend_by_month, spend_by_category, spend_by_destination)
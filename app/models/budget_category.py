@@ -25,6 +25,9 @@ class BudgetCategory(Base):
     planned_amount = Column(Numeric(12, 2), nullable=True)
     currency = Column(String(3), nullable=False, default="USD")
 
+    # bumped on every update; exposed as the ETag for If-Match checks
+    version = Column(Integer, nullable=False, default=1)
+
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,31 @@
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Numeric,
+    String,
+    CheckConstraint,
+    func,
+)
+
+from app.db import Base
+
+
+class FxRate(Base):
+    __tablename__ = "fx_rates"
+
+    # composite PK doubles as the (currency, rate_date) lookup index for conversions
+    currency = Column(String(3), primary_key=True)
+    rate_date = Column(Date, primary_key=True)
+
+    # units of `currency` per 1 unit of settings.fx_base_currency
+    rate = Column(Numeric(18, 8), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("rate > 0", name="ck_fx_rates_rate_positive"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<FxRate {self.currency} {self.rate_date} rate={self.rate}>"
@@ -0,0 +1,45 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    Index,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+
+    # sha256 of the caller's API key, so keys from different callers never collide
+    scope = Column(String(64), nullable=False)
+    key = Column(String(255), nullable=False)
+
+    method = Column(String(8), nullable=False)
+    path = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+
+    # NULL until the first request finishes (the key is "in flight" meanwhile)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(Text, nullable=True)
+    # [name, value] pairs from REPLAYED_HEADERS (app.middleware.idempotency), repeats kept
+    response_headers = Column(JSONB, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey id={self.id} key={self.key!r} status_code={self.status_code}>"
@@ -0,0 +1,58 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    Index,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db import Base
+
+
+class OutboxEvent(Base):
+    """A change event written in the same transaction as the change itself."""
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+
+    # no FK: events must outlive the rows (and trips) they describe
+    trip_id = Column(Integer, nullable=True)
+    aggregate_type = Column(String(40), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    event_type = Column(String(60), nullable=False)  # e.g. reservation.updated
+
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # id of the writing transaction; the change feed orders by (txid, id) and only reads
+    # below the snapshot xmin, so an event is never skipped by committing "late"
+    txid = Column(BigInteger, nullable=False, server_default=text("pg_current_xact_id()::text::bigint"))
+
+    # webhook delivery bookkeeping
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # the delivery worker only ever scans undelivered rows
+        Index(
+            "ix_outbox_events_pending",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text("delivered_at IS NULL"),
+        ),
+        Index("ix_outbox_events_trip_txid", "trip_id", "txid", "id"),
+        # retention purge (app.outbox.purge_expired)
+        Index("ix_outbox_events_created_at", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEvent id={self.id} event_type={self.event_type!r} aggregate_id={self.aggregate_id}>"
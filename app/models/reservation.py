@@ -1,5 +1,6 @@
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     ForeignKey,
     Integer,
@@ -8,12 +9,21 @@ from sqlalchemy import (
     Text,
     Index,
     CheckConstraint,
+    Computed,
+    event,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 
 from app.db import Base
+from app.timezones import local_date
+
+
+# meta keys filtered on often enough to get their own (trip_id, meta ->> key) btree index.
+# Adding a key here needs a migration creating ix_reservations_trip_meta_<key>.
+META_HOT_KEYS = ("flight_number",)
 
 
 class Reservation(Base):
@@ -41,6 +51,9 @@ class Reservation(Base):
     end_at = Column(DateTime(timezone=True), nullable=True)
     timezone = Column(String(64), nullable=True)  # e.g., "America/Los_Angeles"
 
+    # start_at's calendar date in `timezone`, maintained on write (see _set_start_local_date)
+    start_local_date = Column(Date, nullable=True)
+
     location_text = Column(String(200), nullable=True)
     notes = Column(Text, nullable=True)
 
@@ -51,6 +64,21 @@ class Reservation(Base):
     # flexible structured details per reservation type
     meta = Column(JSONB, nullable=False, default=dict)
 
+    # full-text search document, maintained by Postgres (weights drive ts_rank)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(provider, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(location_text, '')), 'C') || "
+            "setweight(to_tsvector('english', coalesce(notes, '')), 'D')",
+            persisted=True,
+        ),
+    )
+
+    # bumped on every update; exposed as the ETag for If-Match checks
+    version = Column(Integer, nullable=False, default=1)
+
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -66,8 +94,35 @@ class Reservation(Base):
             name="ck_reservations_estimated_cost_nonnegative",
         ),
         Index("ix_reservations_trip_start_at", "trip_id", "start_at"),
+        # reminder scheduling scans upcoming start_at ranges across all trips
+        Index(
+            "ix_reservations_start_at_active",
+            "start_at",
+            postgresql_where=text("start_at IS NOT NULL AND status <> 'canceled'"),
+        ),
+        Index("ix_reservations_trip_start_local_date", "trip_id", "start_local_date"),
         Index("ix_reservations_trip_type", "trip_id", "type"),
         Index("ix_reservations_trip_status", "trip_id", "status"),
+        # interval index for overlap checks (btree_gist provides the scalar columns)
+        Index(
+            "ix_reservations_trip_type_period",
+            "trip_id",
+            "type",
+            text("tstzrange(start_at, end_at, '[)')"),
+            postgresql_using="gist",
+            postgresql_where=text("start_at IS NOT NULL AND end_at IS NOT NULL AND status <> 'canceled'"),
+        ),
+        Index("ix_reservations_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_reservations_meta_gin",
+            "meta",
+            postgresql_using="gin",
+            postgresql_ops={"meta": "jsonb_path_ops"},
+        ),
+        *(
+            Index(f"ix_reservations_trip_meta_{key}", "trip_id", text(f"(meta ->> '{key}')"))
+            for key in META_HOT_KEYS
+        ),
     )
 
     def __repr__(self) -> str:
@@ -75,3 +130,9 @@ class Reservation(Base):
             f"<Reservation id={self.id} trip_id={self.trip_id} "
             f"type={self.type} status={self.status} title={self.title!r}>"
         )
+
+
+@event.listens_for(Reservation, "before_insert")
+@event.listens_for(Reservation, "before_update")
+def _set_start_local_date(mapper, connection, target: Reservation) -> None:
+    target.start_local_date = local_date(target.start_at, target.timezone)
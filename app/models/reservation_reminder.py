@@ -0,0 +1,52 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Text,
+    Index,
+    UniqueConstraint,
+    func,
+    text,
+)
+
+from app.db import Base
+
+
+class ReservationReminder(Base):
+    """One reminder per (reservation, offset), materialized shortly before it is due."""
+
+    __tablename__ = "reservation_reminders"
+
+    id = Column(Integer, primary_key=True)
+
+    reservation_id = Column(
+        Integer,
+        ForeignKey("reservations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    offset_minutes = Column(Integer, nullable=False)  # minutes before start_at
+
+    # start_at - offset at materialization; re-checked against the reservation when claimed
+    remind_at = Column(DateTime(timezone=True), nullable=False)
+
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("reservation_id", "offset_minutes", name="uq_reservation_reminders_reservation_offset"),
+        Index(
+            "ix_reservation_reminders_pending",
+            "remind_at",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReservationReminder id={self.id} reservation_id={self.reservation_id} "
+            f"offset_minutes={self.offset_minutes} sent_at={self.sent_at}>"
+        )
@@ -8,8 +8,11 @@ from sqlalchemy import (
     Text,
     Index,
     CheckConstraint,
+    Computed,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -51,6 +54,23 @@ class SpendEntry(Base):
     description = Column(String(200), nullable=True)
     notes = Column(Text, nullable=True)
 
+    # full-text search document, maintained by Postgres (weights drive ts_rank)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(notes, '')), 'D')",
+            persisted=True,
+        ),
+    )
+
+    # bumped on every update; exposed as the ETag for If-Match checks
+    version = Column(Integer, nullable=False, default=1)
+
+    # sha256 of the normalized statement line for imported entries (NULL for manual ones);
+    # unique per trip so re-uploading a statement skips lines already imported
+    content_hash = Column(String(64), nullable=True)
+
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -61,6 +81,14 @@ class SpendEntry(Base):
         CheckConstraint("amount >= 0", name="ck_spend_entries_amount_nonnegative"),
         Index("ix_spend_entries_trip_occurred_at", "trip_id", "occurred_at"),
         Index("ix_spend_entries_trip_currency", "trip_id", "currency"),
+        Index("ix_spend_entries_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ux_spend_entries_trip_content_hash",
+            "trip_id",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("content_hash IS NOT NULL"),
+        ),
     )
 
     def __repr__(self) -> str:
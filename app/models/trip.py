@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Integer, String
+from sqlalchemy import Column, Date, Index, Integer, String
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db import Base
 
@@ -13,3 +13,13 @@ class Trip(Base):
     end_date = Column(Date, nullable = True)
     status = Column(String, nullable = False, default = "planning")
     tags = Column(JSONB, nullable = False, default = list)
+
+    __table_args__ = (
+        # jsonb_path_ops only supports @>, which is all tag filtering uses
+        Index(
+            "ix_trips_tags_gin",
+            "tags",
+            postgresql_using = "gin",
+            postgresql_ops = {"tags": "jsonb_path_ops"},
+        ),
+    )
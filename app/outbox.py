@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import Any, Dict
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import inspect, text, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db import engine
+from app.models.outbox_event import OutboxEvent
+from app.models.spend_entry import SpendEntry
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+
+# table name -> aggregate name used in event types ("reservation.updated", ...)
+AGGREGATE_TYPES = {
+    "trips": "trip",
+    "reservations": "reservation",
+    "spend_entries": "spend_entry",
+    "budget_categories": "budget_category",
+}
+
+# derived columns that are not part of the public representation
+_SKIP_COLUMNS = {"search_vector"}
+
+
+def row_snapshot(obj) -> Dict[str, Any]:
+    """Column values already loaded on obj; never triggers a lazy load."""
+    state = inspect(obj)
+    unloaded = state.unloaded
+    data = {
+        attr.key: getattr(obj, attr.key)
+        for attr in state.mapper.column_attrs
+        if attr.key not in unloaded and attr.key not in _SKIP_COLUMNS
+    }
+    return jsonable_encoder(data)
+
+
+def record_event(db: Session, action: str, obj) -> OutboxEvent:
+    """Queue a change event on db; it commits (or rolls back) together with the change.
+
+    Call after the row has an id (i.e. after a flush for inserts) and before commit.
+    """
+    aggregate_type = AGGREGATE_TYPES[obj.__tablename__]
+    trip_id = obj.id if aggregate_type == "trip" else obj.trip_id
+
+    event = OutboxEvent(
+        trip_id=trip_id,
+        aggregate_type=aggregate_type,
+        aggregate_id=obj.id,
+        event_type=f"{aggregate_type}.{action}",
+        payload=row_snapshot(obj),
+    )
+    db.add(event)
+    return event
+
+
+def unlink_spend_entries(db: Session, column, value: int) -> None:
+    """Null out a SpendEntry foreign key (column) on the entries pointing at value.
+
+    Used before deleting the referenced row instead of the ORM's silent SET NULL, so every
+    unlinked entry gets a version bump and a change event.
+    """
+    unlinked = db.execute(
+        update(SpendEntry)
+        .where(column == value)
+        .values({column: None, SpendEntry.version: SpendEntry.version + 1})
+        .returning(SpendEntry)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    for entry in unlinked:
+        record_event(db, "updated", entry)
+
+
+def purge_expired() -> int:
+    """Delete outbox rows older than outbox_retention_days, delivered or not (dead events too).
+
+    Works in batches, one short transaction each, until nothing old is left; returns the count.
+    """
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            deleted = conn.execute(
+                text(
+                    """
+                    DELETE FROM outbox_events
+                    WHERE id IN (
+                        SELECT id FROM outbox_events
+                        WHERE created_at < now() - make_interval(days => :days)
+                        LIMIT :batch
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    """
+                ),
+                {"days": settings.outbox_retention_days, "batch": PURGE_BATCH_SIZE},
+            ).rowcount
+        total += deleted
+        if deleted < PURGE_BATCH_SIZE:
+            return total
+
+
+async def purge_periodically(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            purged = await run_in_threadpool(purge_expired)
+        except Exception:
+            logger.exception("Outbox purge failed")
+            continue
+
+        if purged:
+            logger.info(f"Purged {purged} outbox events older than {settings.outbox_retention_days} days")
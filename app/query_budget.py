@@ -0,0 +1,67 @@
+import logging
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.db import SessionLocal
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SESSION_INFO_KEY = "query_timeouts"
+
+# Postgres SQLSTATEs raised by statement_timeout / lock_timeout
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+
+db_timeouts = registry.counter(
+    "db_timeouts_total", "Requests aborted by a statement or lock timeout", ("route", "kind")
+)
+
+
+def route_timeouts(route: Optional[str]) -> Tuple[int, int]:
+    """(statement_timeout_ms, lock_timeout_ms) for a route's endpoint name; 0 means no limit."""
+    statement = settings.db_route_statement_timeout_ms.get(route, settings.db_statement_timeout_ms)
+    lock = settings.db_route_lock_timeout_ms.get(route, settings.db_lock_timeout_ms)
+    return statement, lock
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_timeouts(session, transaction, connection):
+    timeouts = session.info.get(SESSION_INFO_KEY)
+    if timeouts is None:
+        return
+    statement, lock = timeouts
+    # is_local=true is SET LOCAL: it ends with the transaction, so pooled connections come back clean
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :statement, true), set_config('lock_timeout', :lock, true)"),
+        {"statement": str(statement), "lock": str(lock)},
+    )
+
+
+async def query_timeout_handler(request: Request, exc: OperationalError):
+    sqlstate = getattr(exc.orig, "sqlstate", None)
+    endpoint = request.scope.get("endpoint")
+    route = getattr(endpoint, "__name__", request.url.path)
+
+    if sqlstate == QUERY_CANCELED:
+        db_timeouts.inc(route, "statement")
+        logger.warning("statement timeout in %s", route)
+        return JSONResponse(status_code=504, content={"detail": "The query took too long; narrow the request and retry"})
+    if sqlstate == LOCK_NOT_AVAILABLE:
+        db_timeouts.inc(route, "lock")
+        logger.warning("lock timeout in %s", route)
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "The row is busy with another change; retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+
+    # anything else (a dropped connection, ...) is a genuine server error. Re-raising from an
+    # exception handler would only surface as a second, unhandled error, so answer here
+    logger.exception("database error in %s", route, exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
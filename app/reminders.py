@@ -0,0 +1,275 @@
+import argparse
+import heapq
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.timezones import get_zone, is_valid_zone
+from app.webhooks import SIGNATURE_HEADER, sign
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink:
+    def send(self, reminder: Dict[str, Any]) -> None:
+        reservation = reminder["reservation"]
+        logger.info(
+            f"Reminder: {reservation['title']} ({reservation['type']}) starts "
+            f"{reservation['start_local']} [reservation {reminder['reservation_id']}]"
+        )
+
+
+class FileSink:
+    """Appends one JSON line per reminder."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, reminder: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reminder) + "\n")
+
+
+class WebhookSink:
+    """POSTs each reminder, signed like the outbox webhooks (see app.webhooks)."""
+
+    def __init__(self, url: str, secret: str):
+        self.url = url
+        self.secret = secret
+        self.client = httpx.Client(timeout=settings.webhook_timeout_seconds)
+
+    def send(self, reminder: Dict[str, Any]) -> None:
+        body = json.dumps(reminder, separators=(",", ":")).encode()
+        response = self.client.post(
+            self.url,
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                SIGNATURE_HEADER: sign(self.secret, int(time.time()), body),
+            },
+        )
+        response.raise_for_status()
+
+
+def make_sink(name: str):
+    if name == "log":
+        return LogSink()
+    if name == "file":
+        return FileSink(settings.reminder_file_path)
+    if name == "webhook":
+        url = settings.reminder_webhook_url or settings.webhook_url
+        if not url or not settings.webhook_secret:
+            raise ValueError("The webhook sink needs REMINDER_WEBHOOK_URL (or WEBHOOK_URL) and WEBHOOK_SECRET")
+        return WebhookSink(url, settings.webhook_secret)
+    raise ValueError(f"Unknown reminder sink: {name}")
+
+
+def materialize(db: Session, window_start: datetime, window_end: datetime, offsets: List[int]) -> None:
+    """Create reminders due in [window_start, window_end); idempotent.
+
+    One index range scan on ix_reservations_start_at_active per offset, never a full scan.
+    Pending reminders of rescheduled reservations get their new remind_at.
+    """
+    db.execute(
+        text(
+            """
+            INSERT INTO reservation_reminders (reservation_id, offset_minutes, remind_at)
+            SELECT r.id, o.minutes, r.start_at - make_interval(mins => o.minutes)
+            FROM unnest(CAST(:offsets AS integer[])) AS o(minutes)
+            JOIN reservations r
+              ON r.start_at >= CAST(:window_start AS timestamptz) + make_interval(mins => o.minutes)
+             AND r.start_at < CAST(:window_end AS timestamptz) + make_interval(mins => o.minutes)
+            WHERE r.start_at IS NOT NULL AND r.status <> 'canceled'
+            ON CONFLICT (reservation_id, offset_minutes) DO UPDATE
+               SET remind_at = EXCLUDED.remind_at
+             WHERE reservation_reminders.sent_at IS NULL
+               AND reservation_reminders.remind_at <> EXCLUDED.remind_at
+            """
+        ),
+        {"offsets": offsets, "window_start": window_start, "window_end": window_end},
+    )
+    db.commit()
+
+
+def pending_until(db: Session, window_start: datetime, window_end: datetime) -> List[Tuple[datetime, int]]:
+    rows = db.execute(
+        text(
+            """
+            SELECT remind_at, id FROM reservation_reminders
+            WHERE sent_at IS NULL
+              AND remind_at >= :window_start AND remind_at < :window_end
+              AND attempts < :max_attempts
+            """
+        ),
+        {"window_start": window_start, "window_end": window_end, "max_attempts": settings.reminder_max_attempts},
+    ).all()
+    return [(row.remind_at, row.id) for row in rows]
+
+
+def _payload(row) -> Dict[str, Any]:
+    start_local = row.start_at
+    if row.timezone and is_valid_zone(row.timezone):
+        start_local = row.start_at.astimezone(get_zone(row.timezone))
+
+    return {
+        "reminder_id": row.id,
+        "reservation_id": row.reservation_id,
+        "trip_id": row.trip_id,
+        "offset_minutes": row.offset_minutes,
+        "remind_at": row.remind_at.isoformat(),
+        "reservation": {
+            "type": row.type,
+            "title": row.title,
+            "start_at": row.start_at.isoformat(),
+            "timezone": row.timezone,
+            "start_local": start_local.isoformat(),
+            "location_text": row.location_text,
+        },
+    }
+
+
+def deliver(sink, reminder_id: int) -> Optional[bool]:
+    """Claim, send and mark one reminder in a single transaction.
+
+    The row lock (SKIP LOCKED) keeps other workers off it while it is being sent, and
+    sent_at commits with the claim, so each (reservation, offset) is delivered once.
+    Returns True when sent, False when it should be retried, None when there is nothing to do.
+    """
+    with SessionLocal() as db:
+        row = db.execute(
+            text(
+                """
+                SELECT rr.id, rr.reservation_id, rr.offset_minutes, rr.remind_at, rr.attempts,
+                       r.trip_id, r.type, r.title, r.start_at, r.timezone, r.location_text,
+                       (r.status <> 'canceled' AND r.start_at IS NOT NULL
+                        AND r.start_at - make_interval(mins => rr.offset_minutes) = rr.remind_at) AS is_current
+                FROM reservation_reminders rr
+                JOIN reservations r ON r.id = rr.reservation_id
+                WHERE rr.id = :id AND rr.sent_at IS NULL AND rr.remind_at <= now()
+                FOR UPDATE OF rr SKIP LOCKED
+                """
+            ),
+            {"id": reminder_id},
+        ).first()
+
+        if row is None:
+            # sent or claimed elsewhere, or rescheduled into the future
+            return None
+
+        if not row.is_current:
+            # canceled or rescheduled since materialization; the next refresh recreates it if still due
+            db.execute(text("DELETE FROM reservation_reminders WHERE id = :id"), {"id": row.id})
+            db.commit()
+            return None
+
+        try:
+            sink.send(_payload(row))
+        except Exception as e:
+            db.execute(
+                text(
+                    "UPDATE reservation_reminders SET attempts = attempts + 1, last_error = :error WHERE id = :id"
+                ),
+                {"id": row.id, "error": f"{type(e).__name__}: {e}"[:1000]},
+            )
+            db.commit()
+            logger.warning(f"Reminder {row.id} failed (attempt {row.attempts + 1}): {e}")
+            return False if row.attempts + 1 < settings.reminder_max_attempts else None
+
+        db.execute(text("UPDATE reservation_reminders SET sent_at = now() WHERE id = :id"), {"id": row.id})
+        db.commit()
+        return True
+
+
+class ReminderScheduler:
+    """Keeps the next window of reminders in an in-memory heap and fires them when due.
+
+    Every refresh re-materializes [now - grace, now + window) so late edits are picked up;
+    between refreshes the worker just sleeps until the next heap entry.
+    """
+
+    def __init__(self, sink, offsets: Optional[List[int]] = None):
+        self.sink = sink
+        self.offsets = offsets or settings.reminder_offsets_minutes
+        self.window = timedelta(minutes=settings.reminder_window_minutes)
+        self.grace = timedelta(minutes=settings.reminder_grace_minutes)
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Set[Tuple[datetime, int]] = set()
+        self._next_refresh = 0.0
+
+    def refresh(self) -> None:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            materialize(db, now - self.grace, now + self.window, self.offsets)
+            for entry in pending_until(db, now - self.grace, now + self.window):
+                if entry not in self._scheduled:
+                    self._scheduled.add(entry)
+                    heapq.heappush(self._heap, entry)
+        self._next_refresh = time.monotonic() + settings.reminder_refresh_seconds
+
+    def dispatch_due(self) -> int:
+        sent = 0
+        now = datetime.now(timezone.utc)
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._scheduled.discard(entry)
+
+            result = deliver(self.sink, entry[1])
+            if result:
+                sent += 1
+            elif result is False:
+                retry = (now + timedelta(seconds=settings.reminder_retry_seconds), entry[1])
+                self._scheduled.add(retry)
+                heapq.heappush(self._heap, retry)
+        return sent
+
+    def seconds_until_next(self) -> float:
+        wait = self._next_refresh - time.monotonic()
+        if self._heap:
+            wait = min(wait, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+        return max(wait, 0.0)
+
+    def run_once(self) -> int:
+        self.refresh()
+        return self.dispatch_due()
+
+    def run(self) -> None:
+        while True:
+            try:
+                if time.monotonic() >= self._next_refresh:
+                    self.refresh()
+                self.dispatch_due()
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+                self._next_refresh = time.monotonic() + settings.reminder_retry_seconds
+            time.sleep(self.seconds_until_next())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send reservation reminders")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run the reminder scheduler")
+    run.add_argument("--once", action="store_true", help="Send what is due now and exit (for cron)")
+    run.add_argument("--sink", choices=["log", "webhook", "file"], default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = ReminderScheduler(make_sink(args.sink or settings.reminder_sink))
+
+    if args.once:
+        logger.info(f"Sent {scheduler.run_once()} reminders")
+        return
+
+    logger.info(f"Scheduling reminders at offsets {scheduler.offsets} (minutes before start)")
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
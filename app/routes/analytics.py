@@ -0,0 +1,105 @@
+import time
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.admission import LOW, admission_class
+from app.analytics import refresh_materialized_views
+from app.deps import get_db
+from app.middleware.auth import require_api_key
+from app.middleware.rate_limit import COST_AGGREGATE, COST_BULK, limit_cost, limiter
+from app.models.analytics import spend_by_category, spend_by_destination, spend_by_month
+from app.schemas.analytics import (
+    AnalyticsRefreshOut,
+    SpendByCategoryRow,
+    SpendByDestinationRow,
+    SpendByMonthRow,
+)
+
+# Cross-trip reporting. Every read here hits the materialized views only, never spend_entries.
+router = APIRouter(
+    prefix="/v1/analytics",
+    tags=["analytics"],
+    dependencies=[Depends(require_api_key)],
+)
+
+
+@router.get("/spend-by-month", response_model=List[SpendByMonthRow])
+@admission_class(LOW)
+@limit_cost(COST_AGGREGATE)
+def analytics_spend_by_month(
+    request: Request,
+    from_month: Optional[date] = Query(default=None, alias="from", description="month >= from"),
+    to_month: Optional[date] = Query(default=None, alias="to", description="month <= to"),
+    currency: Optional[str] = Query(default=None, description="3-letter currency code, e.g. USD"),
+    db: Session = Depends(get_db),
+):
+    stmt = select(spend_by_month)
+
+    if from_month:
+        stmt = stmt.where(spend_by_month.c.month >= from_month.replace(day=1))
+
+    if to_month:
+        stmt = stmt.where(spend_by_month.c.month <= to_month)
+
+    if currency:
+        stmt = stmt.where(spend_by_month.c.currency == currency.strip().upper())
+
+    rows = db.execute(stmt.order_by(spend_by_month.c.month.asc(), spend_by_month.c.currency.asc())).mappings()
+    return [SpendByMonthRow(**row) for row in rows]
+
+
+@router.get("/spend-by-category", response_model=List[SpendByCategoryRow])
+@admission_class(LOW)
+@limit_cost(COST_AGGREGATE)
+def analytics_spend_by_category(
+    request: Request,
+    currency: Optional[str] = Query(default=None, description="3-letter currency code, e.g. USD"),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    stmt = select(spend_by_category)
+
+    if currency:
+        stmt = stmt.where(spend_by_category.c.currency == currency.strip().upper())
+
+    rows = db.execute(
+        stmt.order_by(spend_by_category.c.total.desc(), spend_by_category.c.category_name.asc()).limit(limit)
+    ).mappings()
+    return [SpendByCategoryRow(**row) for row in rows]
+
+
+@router.get("/spend-by-destination", response_model=List[SpendByDestinationRow])
+@admission_class(LOW)
+@limit_cost(COST_AGGREGATE)
+def analytics_spend_by_destination(
+    request: Request,
+    currency: Optional[str] = Query(default=None, description="3-letter currency code, e.g. USD"),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    stmt = select(spend_by_destination)
+
+    if currency:
+        stmt = stmt.where(spend_by_destination.c.currency == currency.strip().upper())
+
+    rows = db.execute(
+        stmt.order_by(spend_by_destination.c.total.desc(), spend_by_destination.c.destination.asc()).limit(limit)
+    ).mappings()
+    return [SpendByDestinationRow(**row) for row in rows]
+
+
+@router.post("/refresh", response_model=AnalyticsRefreshOut)
+@admission_class(LOW)
+@limit_cost(COST_BULK)
+@limiter.limit("2/minute")
+def analytics_refresh(request: Request):
+    started = time.monotonic()
+    refreshed = refresh_materialized_views()
+    if not refreshed:
+        raise HTTPException(status_code=409, detail="Analytics refresh already in progress")
+
+    return AnalyticsRefreshOut(refreshed=refreshed, duration_ms=int((time.monotonic() - started) * 1000))
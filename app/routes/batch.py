@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Tuple
+from urllib.parse import unquote, urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.admission import EXEMPT, admission_class
+from app.config import settings
+from app.middleware.auth import require_api_key
+from app.middleware.rate_limit import COST_READ, limit_cost
+from app.schemas.batch import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/v1",
+    tags=["batch"],
+    dependencies=[Depends(require_api_key)],
+)
+
+BATCH_PATH = "/v1/batch"
+
+# the caller's identity travels with every sub-request so auth and rate-limit keys match
+FORWARDED_HEADERS = ("authorization", "x-forwarded-for", "user-agent")
+DROPPED_RESPONSE_HEADERS = {"content-length", "connection", "transfer-encoding"}
+
+
+def _validate(sub: BatchSubRequest) -> Tuple[str, str, str]:
+    """(path, raw_path, query) for a sub-request, or HTTPException(400) naming what is wrong.
+
+    path is percent-decoded (as servers put it in the ASGI scope) and is what gets checked,
+    so an encoded path cannot slip past the rules below.
+    """
+    if sub.method.upper() != "GET":
+        raise HTTPException(status_code=400, detail=f"Only GET sub-requests are supported (got {sub.method})")
+
+    parts = urlsplit(sub.path)
+    path = unquote(parts.path)
+    if parts.scheme or parts.netloc or not path.startswith("/v1/"):
+        raise HTTPException(status_code=400, detail=f"Sub-request path must be an API path like /v1/...: {sub.path}")
+    if path.rstrip("/") == BATCH_PATH:
+        raise HTTPException(status_code=400, detail="Batches cannot be nested")
+    if path.endswith("/events"):
+        raise HTTPException(status_code=400, detail="Streaming endpoints cannot be batched")
+
+    return path, parts.path, parts.query
+
+
+def _sub_scope(parent: Request, sub: BatchSubRequest, path: str, raw_path: str, query: str) -> Dict:
+    headers: List[Tuple[bytes, bytes]] = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in sub.headers.items()
+        if name.lower() not in FORWARDED_HEADERS and name.lower() != "host"
+    ]
+    for name in FORWARDED_HEADERS + ("host",):
+        value = parent.headers.get(name)
+        if value is not None:
+            headers.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    scope = parent.scope
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": scope.get("scheme", "http"),
+        "server": scope.get("server"),
+        "client": scope.get("client"),
+        "root_path": scope.get("root_path", ""),
+        "path": path,
+        "raw_path": raw_path.encode("utf-8"),
+        "query_string": query.encode("latin-1"),
+        "headers": headers,
+        # fresh per-request state: the batch's own (e.g. slowapi's "already limited" flag) must not leak in
+        "state": {},
+        "app": scope.get("app"),
+    }
+
+
+async def _run_one(app, scope: Dict) -> Tuple[int, Dict[str, str], bytes]:
+    """Drive one request through the ASGI app and collect the response."""
+    finished = asyncio.Event()
+    request_sent = False
+    status = 500
+    headers: Dict[str, str] = {}
+    body: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # nothing more to read; only report a disconnect once the response is done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                headers[name.decode("latin-1").lower()] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return status, headers, b"".join(body)
+
+
+def _decode_body(headers: Dict[str, str], raw: bytes):
+    if not raw:
+        return None
+    if headers.get("content-type", "").startswith("application/json"):
+        return json.loads(raw)
+    return raw.decode("utf-8", errors="replace")
+
+
+async def _execute(
+    request: Request, sub: BatchSubRequest, target: Tuple[str, str, str], gate: asyncio.Semaphore
+) -> BatchSubResponse:
+    path, raw_path, query = target
+    async with gate:
+        scope = _sub_scope(request, sub, path, raw_path, query)
+        try:
+            status, headers, raw = await asyncio.wait_for(
+                _run_one(request.app, scope), timeout=settings.batch_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            return BatchSubResponse(id=sub.id, status=504, body={"detail": "Sub-request timed out"})
+        except Exception:
+            # ServerErrorMiddleware re-raises after sending its 500; keep it to this item so the
+            # rest of the batch still completes
+            logger.exception("Batch sub-request %s failed", path)
+            return BatchSubResponse(id=sub.id, status=500, body={"detail": "Internal Server Error"})
+
+    return BatchSubResponse(
+        id=sub.id,
+        status=status,
+        headers={k: v for k, v in headers.items() if k not in DROPPED_RESPONSE_HEADERS},
+        body=_decode_body(headers, raw),
+    )
+
+
+@router.post("/batch", response_model=BatchResponse)
+@admission_class(EXEMPT)
+@limit_cost(COST_READ)
+async def batch(request: Request, payload: BatchRequest):
+    """Run independent GET sub-requests in one round trip.
+
+    Each sub-request goes through the same middleware and routes as a direct call (so it counts
+    against the caller's rate limits and gets its own pooled DB session), up to
+    batch_max_concurrency at a time. Responses come back in request order. That includes the
+    API key check, which runs once for the batch and again per sub-request; it is a
+    constant-time compare, and skipping it would need a second, trusted route into the app.
+    """
+    if not payload.requests:
+        raise HTTPException(status_code=400, detail="requests must not be empty")
+    if len(payload.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_requests} sub-requests per batch",
+        )
+
+    targets = [_validate(sub) for sub in payload.requests]
+    gate = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+    responses = await asyncio.gather(
+        *(_execute(request, sub, target, gate) for sub, target in zip(payload.requests, targets))
+    )
+    return BatchResponse(responses=list(responses))
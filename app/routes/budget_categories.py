@@ -1,13 +1,16 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.deps import get_db
+from app.deps import get_db, if_match_version, set_etag, update_versioned
 from app.middleware.auth import require_api_key
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import COST_READ, COST_WRITE, limit_cost
 from app.models.budget_category import BudgetCategory
+from app.models.spend_entry import SpendEntry
 from app.models.trip import Trip
+from app.outbox import record_event, unlink_spend_entries
 from app.schemas.budget_category import BudgetCategoryCreate, BudgetCategoryOut, BudgetCategoryUpdate
 
 router = APIRouter(
@@ -17,8 +20,13 @@ router = APIRouter(
 )
 
 
+def _raise_name_conflict(e: IntegrityError) -> None:
+    if getattr(e.orig, "sqlstate", None) == "23505":
+        raise HTTPException(status_code=409, detail="Category name already exists for this trip")
+
+
 @router.post("/trips/{trip_id}/budget-categories", response_model=BudgetCategoryOut, status_code=201)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def create_budget_category(request: Request, trip_id: int, payload: BudgetCategoryCreate, db: Session = Depends(get_db)):
     trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
     if not trip_exists:
@@ -39,13 +47,15 @@ def create_budget_category(request: Request, trip_id: int, payload: BudgetCatego
         currency=payload.currency.strip().upper(),
     )
     db.add(cat)
+    db.flush()
+    record_event(db, "created", cat)
     db.commit()
     db.refresh(cat)
     return cat
 
 
 @router.get("/trips/{trip_id}/budget-categories", response_model=List[BudgetCategoryOut])
-@limiter.limit("30/minute")
+@limit_cost(COST_READ)
 def list_budget_categories(
     request: Request,
     trip_id: int,
@@ -68,41 +78,48 @@ def list_budget_categories(
 
 
 @router.patch("/budget-categories/{category_id}", response_model=BudgetCategoryOut)
-@limiter.limit("30/minute")
-def update_budget_category(request: Request, category_id: int, payload: BudgetCategoryUpdate, db: Session = Depends(get_db)):
-    cat = db.query(BudgetCategory).filter(BudgetCategory.id == category_id).first()
-    if not cat:
-        raise HTTPException(status_code=404, detail="Budget category not found")
-
+@limit_cost(COST_WRITE)
+def update_budget_category(
+    request: Request,
+    response: Response,
+    category_id: int,
+    payload: BudgetCategoryUpdate,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
     data = payload.dict(exclude_unset=True) if hasattr(payload, "dict") else payload.model_dump(exclude_unset=True)
 
     if "currency" in data and data["currency"] is not None:
         data["currency"] = data["currency"].strip().upper()
 
-    if "name" in data and data["name"] is not None:
-        existing = (
-            db.query(BudgetCategory.id)
-            .filter(BudgetCategory.trip_id == cat.trip_id, BudgetCategory.name == data["name"], BudgetCategory.id != cat.id)
-            .first()
-        )
-        if existing:
-            raise HTTPException(status_code=409, detail="Category name already exists for this trip")
-
-    for k, v in data.items():
-        setattr(cat, k, v)
+    # name clashes surface as a unique violation
+    cat = update_versioned(
+        db,
+        BudgetCategory,
+        category_id,
+        data,
+        expected_version,
+        label="Budget category",
+        on_integrity_error=_raise_name_conflict,
+    )
 
+    record_event(db, "updated", cat)
     db.commit()
-    db.refresh(cat)
+
+    set_etag(response, cat.version)
     return cat
 
 
 @router.delete("/budget-categories/{category_id}", status_code=204)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def delete_budget_category(request: Request, category_id: int, db: Session = Depends(get_db)):
     cat = db.query(BudgetCategory).filter(BudgetCategory.id == category_id).first()
     if not cat:
         raise HTTPException(status_code=404, detail="Budget category not found")
 
+    unlink_spend_entries(db, SpendEntry.category_id, category_id)
+
+    record_event(db, "deleted", cat)
     db.delete(cat)
     db.commit()
     return None
@@ -0,0 +1,150 @@
+import base64
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import BigInteger, Text, cast, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.deps import get_db
+from app.middleware.auth import require_api_key
+from app.middleware.rate_limit import COST_LIST, limit_cost
+from app.models.budget_category import BudgetCategory
+from app.models.outbox_event import OutboxEvent
+from app.models.reservation import Reservation
+from app.models.spend_entry import SpendEntry
+from app.models.trip import Trip
+from app.outbox import AGGREGATE_TYPES, row_snapshot
+from app.schemas.changes import ChangeItem, ChangesOut
+
+router = APIRouter(
+    prefix="/v1",
+    tags=["changes"],
+    dependencies=[Depends(require_api_key)],
+)
+
+FEED_MODELS = (Reservation, SpendEntry, BudgetCategory)
+FEED_TYPES = [AGGREGATE_TYPES[model.__tablename__] for model in FEED_MODELS]
+
+# sorts after every event id in the same transaction
+MAX_EVENT_ID = 2**63 - 1
+
+
+def _encode_token(txid: int, event_id: int, issued_at: int) -> str:
+    raw = json.dumps([txid, event_id, issued_at], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_token(token: str) -> Tuple[int, int, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        txid, event_id, issued_at = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = int(txid), int(event_id), int(issued_at)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid since token")
+
+    # txid and event id are bound as bigints; anything outside that range is not ours
+    if not all(0 <= value <= MAX_EVENT_ID for value in values):
+        raise HTTPException(status_code=400, detail="Invalid since token")
+    return values
+
+
+def _parse_since(token: str, now: Optional[float] = None) -> Tuple[int, int, int]:
+    """(txid, event id, issued_at) to resume from; 400 for a malformed token, 410 for an expired one."""
+    since_txid, since_id, issued_at = _decode_token(token)
+
+    # outbox rows are purged after outbox_retention_days, so older tokens may have gaps
+    if (time.time() if now is None else now) - issued_at > settings.outbox_retention_days * 86400:
+        raise HTTPException(status_code=410, detail="since token has expired; sync again without since")
+    return since_txid, since_id, issued_at
+
+
+def _visible_xmin(db: Session) -> int:
+    """Oldest transaction still in progress; every txid below it has committed or aborted."""
+    return db.execute(
+        select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))
+    ).scalar_one()
+
+
+def _full_sync(db: Session, trip_id: int) -> ChangesOut:
+    # Read the position first: rows read afterwards reflect at least every event below it.
+    # Anything newer is replayed as a (harmless) duplicate upsert on the next sync.
+    xmin = _visible_xmin(db)
+
+    changes = []
+    for model in FEED_MODELS:
+        kind = AGGREGATE_TYPES[model.__tablename__]
+        for row in db.query(model).filter(model.trip_id == trip_id).order_by(model.id.asc()):
+            changes.append(ChangeItem(type=kind, id=row.id, op="upsert", data=row_snapshot(row)))
+
+    return ChangesOut(
+        trip_id=trip_id,
+        full_sync=True,
+        changes=changes,
+        next_token=_encode_token(xmin - 1, MAX_EVENT_ID, int(time.time())),
+    )
+
+
+@router.get("/trips/{trip_id}/changes", response_model=ChangesOut)
+@limit_cost(COST_LIST)
+def trip_changes(
+    request: Request,
+    trip_id: int,
+    since: Optional[str] = Query(default=None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(default=500, ge=1, le=1000, description="Max change events read per call"),
+    db: Session = Depends(get_db),
+):
+    trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    if since is None:
+        return _full_sync(db, trip_id)
+
+    since_txid, since_id, issued_at = _parse_since(since)
+
+    xmin = _visible_xmin(db)
+
+    # Range scan on ix_outbox_events_trip_txid
+    events = (
+        db.query(OutboxEvent)
+        .filter(
+            OutboxEvent.trip_id == trip_id,
+            OutboxEvent.aggregate_type.in_(FEED_TYPES),
+            tuple_(OutboxEvent.txid, OutboxEvent.id) > tuple_(since_txid, since_id),
+            OutboxEvent.txid < xmin,
+        )
+        .order_by(OutboxEvent.txid.asc(), OutboxEvent.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    # Collapse to the latest event per row, ordered by that event
+    latest: Dict[Tuple[str, int], OutboxEvent] = {}
+    for event in events:
+        key = (event.aggregate_type, event.aggregate_id)
+        latest.pop(key, None)
+        latest[key] = event
+
+    changes: List[ChangeItem] = []
+    for (kind, item_id), event in latest.items():
+        if event.event_type.endswith(".deleted"):
+            changes.append(ChangeItem(type=kind, id=item_id, op="delete"))
+        else:
+            changes.append(ChangeItem(type=kind, id=item_id, op="upsert", data=event.payload))
+
+    if has_more:
+        next_token = _encode_token(events[-1].txid, events[-1].id, issued_at)
+    else:
+        # caught up: everything below xmin has been returned, so the position can move there
+        position = max((since_txid, since_id), (xmin - 1, MAX_EVENT_ID))
+        if events:
+            position = max(position, (events[-1].txid, events[-1].id))
+        next_token = _encode_token(position[0], position[1], int(time.time()))
+
+    return ChangesOut(trip_id=trip_id, changes=changes, next_token=next_token, has_more=has_more)
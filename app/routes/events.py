@@ -0,0 +1,76 @@
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.admission import EXEMPT, admission_class
+from app.config import settings
+from app.db import SessionLocal
+from app.events import hub
+from app.middleware.auth import require_api_key
+from app.middleware.rate_limit import COST_READ, limit_cost
+from app.models.trip import Trip
+
+router = APIRouter(
+    prefix="/v1",
+    tags=["events"],
+    dependencies=[Depends(require_api_key)],
+)
+
+
+def _trip_exists(trip_id: int) -> bool:
+    # short-lived session: the stream itself never holds a DB connection
+    with SessionLocal() as db:
+        return db.query(Trip.id).filter(Trip.id == trip_id).first() is not None
+
+
+def _sse(event_type: str, data: dict, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _event_stream(request: Request, trip_id: int, queue: asyncio.Queue) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        yield _sse("ready", {"trip_id": trip_id})
+
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.sse_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # comment line keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+
+            yield _sse(message["type"], message, message.get("event_id"))
+    finally:
+        hub.unsubscribe(trip_id, queue)
+
+
+@router.get("/trips/{trip_id}/events")
+@admission_class(EXEMPT)
+@limit_cost(COST_READ)
+async def trip_events(request: Request, trip_id: int):
+    """Server-Sent Events stream of committed changes to the trip's reservations, spend and budget.
+
+    Each event names the changed row (e.g. `reservation.updated`); a `resync` event means the
+    client fell behind and should catch up via `/v1/trips/{trip_id}/changes`.
+    """
+    if not await run_in_threadpool(_trip_exists, trip_id):
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    queue = hub.subscribe(trip_id)
+    return StreamingResponse(
+        _event_stream(request, trip_id, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,19 +1,37 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import groupby
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import Date, Integer, and_, any_, asc, bindparam, cast, desc, literal_column, or_, select, update
 
-from app.deps import get_db
+from app.coalesce import coalesce
+from app.deps import bulk_ids, get_db, if_match_version, set_etag, update_versioned
+from app.fx import converted_amount, rate_cache
 from app.middleware.auth import require_api_key
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import COST_AGGREGATE, COST_LIST, COST_READ, COST_WRITE, limit_cost
 from app.models.trip import Trip
-from app.models.reservation import Reservation
+from app.models.reservation import META_HOT_KEYS, Reservation
+from app.models.spend_entry import SpendEntry
+from app.outbox import record_event, unlink_spend_entries
+from app.timezones import local_date
 from app.schemas.reservation import ReservationCreate, ReservationOut, ReservationUpdate
 
 from sqlalchemy import func
-from app.schemas.reservation import ReservationSummaryOut, CurrencyTotal
+from app.schemas.reservation import (
+    ConvertedTotal,
+    CurrencyTotal,
+    ItineraryDay,
+    ItineraryOut,
+    ReservationConflict,
+    ReservationConflictsOut,
+    ReservationSummaryOut,
+)
 
 
 
@@ -23,9 +41,128 @@ router = APIRouter(
     dependencies=[Depends(require_api_key)],
 )
 
+META_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+META_NUMBER_PATTERN = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+def _meta_value_candidates(raw: str) -> list:
+    # Query strings are untyped; also match the JSON number/boolean a client may have stored
+    candidates = [raw]
+    if raw in ("true", "false"):
+        candidates.append(raw == "true")
+    elif META_NUMBER_PATTERN.match(raw):
+        candidates.append(float(raw) if "." in raw else int(raw))
+    return candidates
+
+
+def _meta_filters(request: Request) -> list:
+    """Turn ?meta.<key>[.<key>...]=<value> params into indexable predicates."""
+    filters = []
+    for param, value in request.query_params.multi_items():
+        if not param.startswith("meta."):
+            continue
+
+        path = param[len("meta."):].split(".")
+        if not all(META_KEY_PATTERN.match(segment) for segment in path):
+            raise HTTPException(status_code=400, detail=f"Invalid meta filter: {param}")
+
+        if len(path) == 1 and path[0] in META_HOT_KEYS:
+            # Same expression as ix_reservations_trip_meta_<key>; key is validated above
+            filters.append(Reservation.meta.op("->>")(literal_column(f"'{path[0]}'")) == value)
+            continue
+
+        # meta @> {...} is served by ix_reservations_meta_gin
+        documents = []
+        for candidate in _meta_value_candidates(value):
+            doc = candidate
+            for segment in reversed(path):
+                doc = {segment: doc}
+            documents.append(doc)
+
+        filters.append(or_(*[Reservation.meta.contains(doc) for doc in documents]))
+
+    return filters
+
+
+def _period(r):
+    # must match the ix_reservations_trip_type_period expression, so the bounds are inlined
+    return func.tstzrange(r.start_at, r.end_at, literal_column("'[)'"))
+
+
+def _active_period(r):
+    # must imply the partial index predicate of ix_reservations_trip_type_period
+    return and_(
+        r.start_at.isnot(None),
+        r.end_at.isnot(None),
+        r.status != literal_column("'canceled'"),
+    )
+
+
+def _raise_for_integrity_error(db: Session, e: IntegrityError) -> None:
+    db.rollback()
+    sqlstate = getattr(e.orig, "sqlstate", None)
+    # exclusion_violation from the optional ex_reservations_no_overlap constraint
+    if sqlstate == "23P01":
+        raise HTTPException(status_code=409, detail="Reservation overlaps an existing reservation of the same type")
+    # check_violation, e.g. a new end_at before the stored start_at
+    if sqlstate == "23514":
+        raise HTTPException(status_code=400, detail="Update violates a reservation constraint (end_at must be >= start_at)")
+    raise e
+
+
+def _commit_or_overlap_conflict(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError as e:
+        _raise_for_integrity_error(db, e)
+
+
+def _refresh_start_local_date(db: Session, reservation: Reservation) -> None:
+    """Recompute start_local_date after a PATCH touched start_at/timezone (the UPDATE bypasses
+    the mapper hook). Done in Python with the same zoneinfo lookup as inserts; only writes
+    when the date actually moved."""
+    value = local_date(reservation.start_at, reservation.timezone)
+    if value != reservation.start_local_date:
+        db.execute(
+            update(Reservation)
+            .where(Reservation.id == reservation.id)
+            .values(start_local_date=value)
+            .execution_options(synchronize_session=False)
+        )
+        reservation.start_local_date = value
+
+
+@lru_cache(maxsize=None)
+def _list_reservations_stmt(has_type: bool, has_status: bool, has_from: bool, has_to: bool):
+    """Prebuilt list query per filter combination, with every value a bind parameter.
+
+    The construct (and its cache key) is reused across requests, so a request only binds
+    values: no statement building, and the same SQL text every time for psycopg to prepare.
+    """
+    stmt = select(Reservation).where(Reservation.trip_id == bindparam("trip_id"))
+
+    if has_type:
+        stmt = stmt.where(Reservation.type == bindparam("type"))
+
+    if has_status:
+        stmt = stmt.where(Reservation.status == bindparam("status"))
+
+    if has_from:
+        stmt = stmt.where(Reservation.start_at >= bindparam("from_dt"))
+
+    if has_to:
+        stmt = stmt.where(Reservation.start_at <= bindparam("to_dt"))
+
+    # Professional sort: itinerary first (nulls last), then newest created
+    return stmt.order_by(
+        asc(Reservation.start_at).nulls_last(),
+        desc(Reservation.created_at),
+        desc(Reservation.id),
+    ).offset(bindparam("offset")).limit(bindparam("limit"))
+
 
 @router.post("/trips/{trip_id}/reservations", response_model=ReservationOut, status_code=201)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def create_reservation(
     request: Request,
     trip_id: int,
@@ -54,13 +191,19 @@ def create_reservation(
     )
 
     db.add(reservation)
-    db.commit()
+    try:
+        db.flush()
+    except IntegrityError as e:
+        _raise_for_integrity_error(db, e)
+
+    record_event(db, "created", reservation)
+    _commit_or_overlap_conflict(db)
     db.refresh(reservation)
     return reservation
 
 
 @router.get("/trips/{trip_id}/reservations", response_model=List[ReservationOut])
-@limiter.limit("30/minute")
+@limit_cost(COST_LIST)
 def list_reservations(
     request: Request,
     trip_id: int,
@@ -77,70 +220,204 @@ def list_reservations(
     if not trip_exists:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    q = db.query(Reservation).filter(Reservation.trip_id == trip_id)
+    params = {"trip_id": trip_id, "offset": offset, "limit": limit}
+    if type:
+        params["type"] = type.strip().lower()
+    if status:
+        params["status"] = status.strip().lower()
+    if from_dt:
+        params["from_dt"] = from_dt
+    if to_dt:
+        params["to_dt"] = to_dt
+
+    stmt = _list_reservations_stmt("type" in params, "status" in params, "from_dt" in params, "to_dt" in params)
+
+    # meta.<key>=<value> filters, e.g. ?meta.flight_number=UA123&meta.seat=14C (built per request)
+    meta_filters = _meta_filters(request)
+    if meta_filters:
+        stmt = stmt.where(*meta_filters)
+
+    return db.execute(stmt, params).scalars().all()
+
+
+@router.get("/trips/{trip_id}/reservations/conflicts", response_model=ReservationConflictsOut)
+@limit_cost(COST_AGGREGATE)
+def reservation_conflicts(
+    request: Request,
+    trip_id: int,
+    type: Optional[str] = Query(default=None, description="Only check this reservation type"),
+    db: Session = Depends(get_db),
+):
+    trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    a = aliased(Reservation)
+    b = aliased(Reservation)
+
+    # Self-join probes the GiST index for each reservation instead of comparing every pair
+    q = (
+        db.query(
+            a.type,
+            a.id,
+            a.title,
+            b.id,
+            b.title,
+            func.greatest(a.start_at, b.start_at),
+            func.least(a.end_at, b.end_at),
+        )
+        .join(
+            b,
+            and_(
+                b.trip_id == a.trip_id,
+                b.type == a.type,
+                b.id > a.id,
+                _active_period(b),
+                _period(b).op("&&")(_period(a)),
+            ),
+        )
+        .filter(a.trip_id == trip_id, _active_period(a))
+    )
 
     if type:
-        q = q.filter(Reservation.type == type.strip().lower())
+        q = q.filter(a.type == type.strip().lower())
 
-    if status:
-        q = q.filter(Reservation.status == status.strip().lower())
+    rows = q.order_by(a.start_at.asc(), a.id.asc(), b.id.asc()).all()
 
-    if from_dt:
-        q = q.filter(Reservation.start_at >= from_dt)
+    return ReservationConflictsOut(
+        trip_id=trip_id,
+        conflicts=[
+            ReservationConflict(
+                type=rtype,
+                reservation_id=a_id,
+                reservation_title=a_title,
+                conflicts_with_id=b_id,
+                conflicts_with_title=b_title,
+                overlap_start=overlap_start,
+                overlap_end=overlap_end,
+            )
+            for rtype, a_id, a_title, b_id, b_title, overlap_start, overlap_end in rows
+        ],
+    )
 
-    if to_dt:
-        q = q.filter(Reservation.start_at <= to_dt)
 
-    # Professional sort: itinerary first (nulls last), then newest created
-    # Postgres supports NULLS LAST; SQLAlchemy uses .nulls_last()
-    q = q.order_by(
-        asc(Reservation.start_at).nulls_last(),
-        desc(Reservation.created_at),
-        desc(Reservation.id),
+@router.get("/trips/{trip_id}/itinerary", response_model=ItineraryOut)
+@limit_cost(COST_AGGREGATE)
+def trip_itinerary(
+    request: Request,
+    trip_id: int,
+    from_date: Optional[date] = Query(default=None, alias="from", description="First local day (inclusive)"),
+    to_date: Optional[date] = Query(default=None, alias="to", description="Last local day (inclusive)"),
+    include_canceled: bool = Query(default=False),
+    db: Session = Depends(get_db),
+):
+    trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    if from_date and to_date and to_date < from_date:
+        raise HTTPException(status_code=400, detail="to must be >= from")
+
+    # start_local_date is precomputed on write, so this is a range scan on
+    # ix_reservations_trip_start_local_date with no per-row timezone math
+    q = db.query(Reservation).filter(
+        Reservation.trip_id == trip_id,
+        Reservation.start_local_date.isnot(None),
     )
 
-    reservations = q.offset(offset).limit(limit).all()
-    return reservations
+    if from_date:
+        q = q.filter(Reservation.start_local_date >= from_date)
+
+    if to_date:
+        q = q.filter(Reservation.start_local_date <= to_date)
+
+    if not include_canceled:
+        q = q.filter(Reservation.status != "canceled")
+
+    reservations = q.order_by(
+        Reservation.start_local_date.asc(),
+        Reservation.start_at.asc(),
+        Reservation.id.asc(),
+    ).all()
+
+    days = [
+        ItineraryDay(date=day, reservations=list(items))
+        for day, items in groupby(reservations, key=lambda r: r.start_local_date)
+    ]
+
+    return ItineraryOut(trip_id=trip_id, days=days)
+
+
+@router.get("/reservations", response_model=List[ReservationOut])
+@limit_cost(COST_LIST)
+def get_reservations_by_ids(
+    request: Request,
+    ids: List[int] = Depends(bulk_ids),
+    db: Session = Depends(get_db),
+):
+    """Reservations for ?ids=, in the requested order; ids that do not exist are left out."""
+    # one array parameter, so every batch size shares the same statement
+    rows = db.query(Reservation).filter(
+        Reservation.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+    ).all()
+    by_id = {r.id: r for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
 
 
 @router.get("/reservations/{reservation_id}", response_model=ReservationOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_READ)
 def get_reservation(
     request: Request,
+    response: Response,
     reservation_id: int,
     db: Session = Depends(get_db),
 ):
     reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    set_etag(response, reservation.version)
     return reservation
 
 
 @router.patch("/reservations/{reservation_id}", response_model=ReservationOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def update_reservation(
     request: Request,
+    response: Response,
     reservation_id: int,
     payload: ReservationUpdate,
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
 ):
-    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
-    if not reservation:
-        raise HTTPException(status_code=404, detail="Reservation not found")
-
     data = payload.dict(exclude_unset=True) if hasattr(payload, "dict") else payload.model_dump(exclude_unset=True)
 
-    # Apply updates
-    for key, value in data.items():
-        setattr(reservation, key, value)
+    values = dict(data)
+    if "start_at" in data and "timezone" in data:
+        values["start_local_date"] = local_date(data["start_at"], data["timezone"])
+
+    reservation = update_versioned(
+        db,
+        Reservation,
+        reservation_id,
+        values,
+        expected_version,
+        label="Reservation",
+        on_integrity_error=lambda e: _raise_for_integrity_error(db, e),
+    )
+
+    # one of start_at/timezone changed: the new local date depends on the stored other half
+    if ("start_at" in data) != ("timezone" in data):
+        _refresh_start_local_date(db, reservation)
 
-    db.commit()
-    db.refresh(reservation)
+    record_event(db, "updated", reservation)
+    _commit_or_overlap_conflict(db)
+
+    set_etag(response, reservation.version)
     return reservation
 
 
 @router.delete("/reservations/{reservation_id}", status_code=204)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def delete_reservation(
     request: Request,
     reservation_id: int,
@@ -150,15 +427,25 @@ def delete_reservation(
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
 
+    unlink_spend_entries(db, SpendEntry.reservation_id, reservation_id)
+
+    record_event(db, "deleted", reservation)
     db.delete(reservation)
     db.commit()
     return None
 
 @router.get("/trips/{trip_id}/reservations/summary", response_model=ReservationSummaryOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_AGGREGATE)
+@coalesce
 def reservation_summary(
     request: Request,
     trip_id: int,
+    convert_to: Optional[str] = Query(
+        default=None,
+        min_length=3,
+        max_length=3,
+        description="Also return one estimated total converted to this currency",
+    ),
     db: Session = Depends(get_db),
 ):
     # Ensure trip exists
@@ -205,9 +492,41 @@ def reservation_summary(
         for currency, total in total_rows
     ]
 
+    converted_total = None
+    if convert_to:
+        target = convert_to.strip().upper()
+        if not rate_cache.has_currency(db, target):
+            raise HTTPException(status_code=400, detail=f"No FX rates loaded for {target}")
+
+        # Convert inside the aggregate at the start date's rate (latest rate when unscheduled)
+        priced_on = func.coalesce(cast(func.timezone("UTC", Reservation.start_at), Date), func.current_date())
+        converted = (
+            db.query(
+                converted_amount(
+                    Reservation.estimated_cost_amount,
+                    Reservation.estimated_cost_currency,
+                    priced_on,
+                    target,
+                ).label("amount")
+            )
+            .filter(
+                Reservation.trip_id == trip_id,
+                Reservation.estimated_cost_amount.isnot(None),
+            )
+            .subquery()
+        )
+
+        total, unconverted = db.query(
+            func.coalesce(func.round(func.sum(converted.c.amount), 2), 0),
+            func.count().filter(converted.c.amount.is_(None)),
+        ).one()
+
+        converted_total = ConvertedTotal(currency=target, total=total, unconverted_reservations=unconverted)
+
     return ReservationSummaryOut(
         trip_id=trip_id,
         by_status=by_status,
         by_type=by_type,
         estimated_totals=estimated_totals,
+        converted_total=converted_total,
     )
@@ -0,0 +1,109 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import Float, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.deps import get_db
+from app.middleware.auth import require_api_key
+from app.middleware.rate_limit import COST_AGGREGATE, limit_cost
+from app.models.reservation import Reservation
+from app.models.spend_entry import SpendEntry
+from app.models.trip import Trip
+from app.schemas.search import SearchHit, SearchResultsOut
+
+router = APIRouter(
+    prefix="/v1",
+    tags=["search"],
+    dependencies=[Depends(require_api_key)],
+)
+
+
+def _encode_cursor(rank: float, kind: str, item_id: int) -> str:
+    raw = json.dumps([rank, kind, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, kind, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(rank), str(kind), int(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/trips/{trip_id}/search", response_model=SearchResultsOut)
+@limit_cost(COST_AGGREGATE)
+def search_trip(
+    request: Request,
+    trip_id: int,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (web search syntax, e.g. hilton -airport)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    tsquery = func.websearch_to_tsquery("english", q)
+
+    # Both branches filter on search_vector @@ query, which is served by the GIN indexes
+    reservations = select(
+        literal("reservation").label("kind"),
+        Reservation.id.label("id"),
+        Reservation.title.label("title"),
+        Reservation.start_at.label("at"),
+        func.ts_rank(Reservation.search_vector, tsquery).cast(Float).label("rank"),
+    ).where(
+        Reservation.trip_id == trip_id,
+        Reservation.search_vector.op("@@")(tsquery),
+    )
+
+    spend_entries = select(
+        literal("spend_entry").label("kind"),
+        SpendEntry.id.label("id"),
+        SpendEntry.description.label("title"),
+        SpendEntry.occurred_at.label("at"),
+        func.ts_rank(SpendEntry.search_vector, tsquery).cast(Float).label("rank"),
+    ).where(
+        SpendEntry.trip_id == trip_id,
+        SpendEntry.search_vector.op("@@")(tsquery),
+    )
+
+    hits = union_all(reservations, spend_entries).subquery("hits")
+
+    # Keyset paging on (rank, kind, id), all descending. rank is selected as double precision
+    # so the float carried in the cursor round-trips exactly.
+    stmt = select(hits)
+    if cursor:
+        after_rank, after_kind, after_id = _decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(hits.c.rank, hits.c.kind, hits.c.id) < tuple_(after_rank, after_kind, after_id)
+        )
+
+    rows = (
+        db.execute(
+            stmt.order_by(hits.c.rank.desc(), hits.c.kind.desc(), hits.c.id.desc()).limit(limit + 1)
+        )
+        .mappings()
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last["rank"], last["kind"], last["id"])
+
+    return SearchResultsOut(
+        trip_id=trip_id,
+        query=q,
+        items=[SearchHit(**row) for row in rows],
+        next_cursor=next_cursor,
+    )
@@ -1,23 +1,40 @@
-from datetime import datetime
+import tempfile
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import desc, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Date, Integer, any_, bindparam, cast, desc, exists, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
-
-from app.deps import get_db
+from starlette.concurrency import run_in_threadpool
+
+from app.admission import LOW, admission_class
+from app.coalesce import coalesce
+from app.deps import bulk_ids, get_db, if_match_version, set_etag, update_versioned
+from app.config import settings
+from app.fx import converted_amount, rate_cache
+from app.ledger_import import ImportErrors, import_spend_entries, parse_csv, parse_ofx
+from app.outbox import record_event
+from app.timezones import get_zone, is_valid_zone
 from app.middleware.auth import require_api_key
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import COST_AGGREGATE, COST_BULK, COST_LIST, COST_READ, COST_WRITE, limit_cost, limiter
 from app.models.budget_category import BudgetCategory
 from app.models.reservation import Reservation
 from app.models.spend_entry import SpendEntry
 from app.models.trip import Trip
 from app.schemas.spend_entry import (
+    SpendConvertedTotal,
     SpendCurrencyTotal,
     SpendEntryCreate,
     SpendEntryOut,
     SpendEntryUpdate,
+    SpendImportOut,
     SpendSummaryOut,
+    SpendTimeseriesBucket,
+    SpendTimeseriesOut,
+    SpendTimeseriesTotal,
 )
 
 router = APIRouter(
@@ -26,9 +43,58 @@ router = APIRouter(
     dependencies=[Depends(require_api_key)],
 )
 
+MAX_TIMESERIES_BUCKETS = 1000
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    # mirrors Postgres date_trunc: weeks start on Monday
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _local_day(at: datetime, tz: str) -> date:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=dt_timezone.utc)
+    return at.astimezone(get_zone(tz)).date()
+
+
+@lru_cache(maxsize=None)
+def _list_spend_entries_stmt(has_currency: bool, has_reservation: bool, has_category: bool, has_from: bool, has_to: bool):
+    """Prebuilt list query per filter combination (see _list_reservations_stmt)."""
+    stmt = select(SpendEntry).where(SpendEntry.trip_id == bindparam("trip_id"))
+
+    if has_currency:
+        stmt = stmt.where(SpendEntry.currency == bindparam("currency"))
+
+    if has_reservation:
+        stmt = stmt.where(SpendEntry.reservation_id == bindparam("reservation_id"))
+
+    if has_category:
+        stmt = stmt.where(SpendEntry.category_id == bindparam("category_id"))
+
+    if has_from:
+        stmt = stmt.where(SpendEntry.occurred_at >= bindparam("from_dt"))
+
+    if has_to:
+        stmt = stmt.where(SpendEntry.occurred_at <= bindparam("to_dt"))
+
+    # Newest first (ledger view)
+    return stmt.order_by(desc(SpendEntry.occurred_at), desc(SpendEntry.id)).offset(bindparam("offset")).limit(bindparam("limit"))
+
 
 @router.post("/trips/{trip_id}/spend-entries", response_model=SpendEntryOut, status_code=201)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def create_spend_entry(
     request: Request,
     trip_id: int,
@@ -75,13 +141,70 @@ def create_spend_entry(
     )
 
     db.add(entry)
+    db.flush()
+    record_event(db, "created", entry)
     db.commit()
     db.refresh(entry)
     return entry
 
 
+# bodies above this stay on disk while they are parsed
+IMPORT_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+def _run_import(db: Session, trip_id: int, body, format: str, currency: str, tz: str, negate: bool) -> dict:
+    if not db.query(Trip.id).filter(Trip.id == trip_id).first():
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    errors = ImportErrors()
+    if format == "ofx":
+        rows = parse_ofx(body, currency, negate, errors)
+    else:
+        rows = parse_csv(body, currency, tz, negate, errors)
+
+    try:
+        return import_spend_entries(db, trip_id, rows, errors)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/trips/{trip_id}/spend-entries/import", response_model=SpendImportOut)
+@admission_class(LOW)
+@limit_cost(COST_BULK)
+@limiter.limit("5/minute")
+async def import_spend_entries_file(
+    request: Request,
+    trip_id: int,
+    format: str = Query(default="csv", pattern="^(csv|ofx)$"),
+    currency: str = Query(default="USD", min_length=3, max_length=3, description="For rows without a currency"),
+    tz: str = Query(default="UTC", description="IANA zone for CSV dates without a time zone"),
+    negate: bool = Query(default=False, description="Flip signs (statements that record spend as negative)"),
+    db: Session = Depends(get_db),
+):
+    """Import a bank statement sent as the raw request body (CSV with a header row, or OFX).
+
+    CSV columns: date (or occurred_at), amount, and optionally currency, description, category
+    (budget category name), notes, id. Lines already imported into the trip are skipped.
+    """
+    if not is_valid_zone(tz):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    # Spool the upload (memory up to 1 MiB, then disk) so parsing never holds the whole file
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY_BYTES) as body:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.spend_import_max_bytes:
+                raise HTTPException(status_code=413, detail="Import file is too large")
+            body.write(chunk)
+        body.seek(0)
+
+        return await run_in_threadpool(_run_import, db, trip_id, body, format, currency.upper(), tz, negate)
+
+
 @router.get("/trips/{trip_id}/spend-entries", response_model=List[SpendEntryOut])
-@limiter.limit("30/minute")
+@limit_cost(COST_LIST)
 def list_spend_entries(
     request: Request,
     trip_id: int,
@@ -98,16 +221,56 @@ def list_spend_entries(
     if not trip_exists:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    q = db.query(SpendEntry).filter(SpendEntry.trip_id == trip_id)
-
+    params = {"trip_id": trip_id, "offset": offset, "limit": limit}
     if currency:
-        q = q.filter(SpendEntry.currency == currency.strip().upper())
-
+        params["currency"] = currency.strip().upper()
     if reservation_id is not None:
-        q = q.filter(SpendEntry.reservation_id == reservation_id)
-
+        params["reservation_id"] = reservation_id
     if category_id is not None:
-        q = q.filter(SpendEntry.category_id == category_id)
+        params["category_id"] = category_id
+    if from_dt:
+        params["from_dt"] = from_dt
+    if to_dt:
+        params["to_dt"] = to_dt
+
+    stmt = _list_spend_entries_stmt(
+        "currency" in params,
+        "reservation_id" in params,
+        "category_id" in params,
+        "from_dt" in params,
+        "to_dt" in params,
+    )
+    return db.execute(stmt, params).scalars().all()
+
+
+@router.get("/trips/{trip_id}/spend-entries/timeseries", response_model=SpendTimeseriesOut)
+@admission_class(LOW)
+@limit_cost(COST_AGGREGATE)
+def spend_entries_timeseries(
+    request: Request,
+    trip_id: int,
+    bucket: str = Query(default="day", pattern="^(day|week|month)$"),
+    tz: str = Query(default="UTC", max_length=64, description="IANA zone used to cut buckets"),
+    from_dt: Optional[datetime] = Query(default=None, alias="from", description="occurred_at >= from"),
+    to_dt: Optional[datetime] = Query(default=None, alias="to", description="occurred_at <= to"),
+    currency: Optional[str] = Query(default=None, description="3-letter currency code, e.g. USD"),
+    db: Session = Depends(get_db),
+):
+    trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    if not is_valid_zone(tz):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    # Bucket in SQL; trip_id + occurred_at range is served by ix_spend_entries_trip_occurred_at
+    local_bucket = cast(func.date_trunc(bucket, func.timezone(tz, SpendEntry.occurred_at)), Date)
+    q = db.query(
+        local_bucket.label("start"),
+        SpendEntry.currency.label("currency"),
+        SpendEntry.category_id.label("category_id"),
+        SpendEntry.amount.label("amount"),
+    ).filter(SpendEntry.trip_id == trip_id)
 
     if from_dt:
         q = q.filter(SpendEntry.occurred_at >= from_dt)
@@ -115,77 +278,145 @@ def list_spend_entries(
     if to_dt:
         q = q.filter(SpendEntry.occurred_at <= to_dt)
 
-    # Newest first (ledger view)
-    q = q.order_by(desc(SpendEntry.occurred_at), desc(SpendEntry.id))
+    if currency:
+        q = q.filter(SpendEntry.currency == currency.strip().upper())
+
+    entries = q.subquery()
+    rows = (
+        db.query(
+            entries.c.start,
+            entries.c.currency,
+            entries.c.category_id,
+            func.sum(entries.c.amount),
+            func.count(),
+        )
+        .group_by(entries.c.start, entries.c.currency, entries.c.category_id)
+        .order_by(entries.c.start, entries.c.currency, entries.c.category_id)
+        .all()
+    )
+
+    totals_by_start = defaultdict(list)
+    for start, cur, category_id, total, count in rows:
+        totals_by_start[start].append(
+            SpendTimeseriesTotal(currency=cur, category_id=category_id, total=total, entries=count)
+        )
+
+    first = _bucket_start(_local_day(from_dt, tz), bucket) if from_dt else min(totals_by_start, default=None)
+    last = _bucket_start(_local_day(to_dt, tz), bucket) if to_dt else max(totals_by_start, default=None)
+
+    # Fill gaps so charts get one bucket per step, including zero-spend ones
+    buckets = []
+    start = first
+    while first is not None and last is not None and start <= last:
+        if len(buckets) >= MAX_TIMESERIES_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"Range spans more than {MAX_TIMESERIES_BUCKETS} buckets")
+        totals = totals_by_start.get(start, [])
+        buckets.append(
+            SpendTimeseriesBucket(start=start, total_entries=sum(t.entries for t in totals), totals=totals)
+        )
+        start = _next_bucket(start, bucket)
 
-    return q.offset(offset).limit(limit).all()
+    return SpendTimeseriesOut(trip_id=trip_id, bucket=bucket, tz=tz, buckets=buckets)
+
+
+@router.get("/spend-entries", response_model=List[SpendEntryOut])
+@limit_cost(COST_LIST)
+def get_spend_entries_by_ids(
+    request: Request,
+    ids: List[int] = Depends(bulk_ids),
+    db: Session = Depends(get_db),
+):
+    """Spend entries for ?ids=, in the requested order; ids that do not exist are left out."""
+    rows = db.query(SpendEntry).filter(
+        SpendEntry.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+    ).all()
+    by_id = {e.id: e for e in rows}
+    return [by_id[i] for i in ids if i in by_id]
 
 
 @router.get("/spend-entries/{spend_entry_id}", response_model=SpendEntryOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_READ)
 def get_spend_entry(
     request: Request,
+    response: Response,
     spend_entry_id: int,
     db: Session = Depends(get_db),
 ):
     entry = db.query(SpendEntry).filter(SpendEntry.id == spend_entry_id).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Spend entry not found")
+    set_etag(response, entry.version)
     return entry
 
 
+def _raise_update_failure(db: Session, spend_entry_id: int, data: dict) -> None:
+    """The conditional UPDATE matched nothing; work out why (only runs on the failure path)."""
+    entry = db.query(SpendEntry.trip_id).filter(SpendEntry.id == spend_entry_id).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Spend entry not found")
+
+    if data.get("reservation_id") is not None:
+        res = db.query(Reservation.trip_id).filter(Reservation.id == data["reservation_id"]).first()
+        if not res:
+            raise HTTPException(status_code=404, detail="Reservation not found")
+        if res.trip_id != entry.trip_id:
+            raise HTTPException(status_code=400, detail="reservation_id does not belong to this trip")
+
+    if data.get("category_id") is not None:
+        cat = db.query(BudgetCategory.trip_id).filter(BudgetCategory.id == data["category_id"]).first()
+        if not cat:
+            raise HTTPException(status_code=404, detail="Budget category not found")
+        if cat.trip_id != entry.trip_id:
+            raise HTTPException(status_code=400, detail="category_id does not belong to this trip")
+
+    raise HTTPException(status_code=412, detail="Spend entry was modified by another request")
+
+
 @router.patch("/spend-entries/{spend_entry_id}", response_model=SpendEntryOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def update_spend_entry(
     request: Request,
+    response: Response,
     spend_entry_id: int,
     payload: SpendEntryUpdate,
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
 ):
-    entry = db.query(SpendEntry).filter(SpendEntry.id == spend_entry_id).first()
-    if not entry:
-        raise HTTPException(status_code=404, detail="Spend entry not found")
-
     data = payload.dict(exclude_unset=True) if hasattr(payload, "dict") else payload.model_dump(exclude_unset=True)
 
-    # Validate reservation_id update (optional)
-    if "reservation_id" in data and data["reservation_id"] is not None:
-        res = (
-            db.query(Reservation.id, Reservation.trip_id)
-            .filter(Reservation.id == data["reservation_id"])
-            .first()
+    # the trip-ownership checks ride along in the WHERE clause
+    criteria = []
+    if data.get("reservation_id") is not None:
+        criteria.append(
+            exists().where(Reservation.id == data["reservation_id"], Reservation.trip_id == SpendEntry.trip_id)
         )
-        if not res:
-            raise HTTPException(status_code=404, detail="Reservation not found")
-        if res.trip_id != entry.trip_id:
-            raise HTTPException(status_code=400, detail="reservation_id does not belong to this trip")
 
-    # Validate category_id update (optional)
-    if "category_id" in data:
-        if data["category_id"] is None:
-            # allow unsetting category
-            pass
-        else:
-            cat = (
-                db.query(BudgetCategory.id, BudgetCategory.trip_id)
-                .filter(BudgetCategory.id == data["category_id"])
-                .first()
-            )
-            if not cat:
-                raise HTTPException(status_code=404, detail="Budget category not found")
-            if cat.trip_id != entry.trip_id:
-                raise HTTPException(status_code=400, detail="category_id does not belong to this trip")
-
-    for key, value in data.items():
-        setattr(entry, key, value)
+    # category_id may be set to null to unset the category
+    if data.get("category_id") is not None:
+        criteria.append(
+            exists().where(BudgetCategory.id == data["category_id"], BudgetCategory.trip_id == SpendEntry.trip_id)
+        )
+
+    entry = update_versioned(
+        db,
+        SpendEntry,
+        spend_entry_id,
+        data,
+        expected_version,
+        label="Spend entry",
+        criteria=criteria,
+        explain_miss=lambda: _raise_update_failure(db, spend_entry_id, data),
+    )
 
+    record_event(db, "updated", entry)
     db.commit()
-    db.refresh(entry)
+
+    set_etag(response, entry.version)
     return entry
 
 
 @router.delete("/spend-entries/{spend_entry_id}", status_code=204)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def delete_spend_entry(
     request: Request,
     spend_entry_id: int,
@@ -195,16 +426,24 @@ def delete_spend_entry(
     if not entry:
         raise HTTPException(status_code=404, detail="Spend entry not found")
 
+    record_event(db, "deleted", entry)
     db.delete(entry)
     db.commit()
     return None
 
 
 @router.get("/trips/{trip_id}/spend-entries/summary", response_model=SpendSummaryOut)
-@limiter.limit("30/minute")
+@limit_cost(COST_AGGREGATE)
+@coalesce
 def spend_entries_summary(
     request: Request,
     trip_id: int,
+    convert_to: Optional[str] = Query(
+        default=None,
+        min_length=3,
+        max_length=3,
+        description="Also return one total converted to this currency",
+    ),
     db: Session = Depends(get_db),
 ):
     trip_exists = db.query(Trip.id).filter(Trip.id == trip_id).first()
@@ -232,8 +471,30 @@ def spend_entries_summary(
         for currency, total in totals_rows
     ]
 
+    converted_total = None
+    if convert_to:
+        target = convert_to.strip().upper()
+        if not rate_cache.has_currency(db, target):
+            raise HTTPException(status_code=400, detail=f"No FX rates loaded for {target}")
+
+        # Convert inside the aggregate, at the rate for each entry's (UTC) occurred_at date
+        occurred_on = cast(func.timezone("UTC", SpendEntry.occurred_at), Date)
+        converted = (
+            db.query(converted_amount(SpendEntry.amount, SpendEntry.currency, occurred_on, target).label("amount"))
+            .filter(SpendEntry.trip_id == trip_id)
+            .subquery()
+        )
+
+        total, unconverted = db.query(
+            func.coalesce(func.round(func.sum(converted.c.amount), 2), 0),
+            func.count().filter(converted.c.amount.is_(None)),
+        ).one()
+
+        converted_total = SpendConvertedTotal(currency=target, total=total, unconverted_entries=unconverted)
+
     return SpendSummaryOut(
         trip_id=trip_id,
         total_entries=total_entries,
         totals_by_currency=totals_by_currency,
+        converted_total=converted_total,
     )
@@ -1,14 +1,20 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Text, cast, func, or_, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, aliased, selectinload
 
 from app.deps import get_db
 from app.middleware.auth import require_api_key
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import COST_AGGREGATE, COST_LIST, COST_READ, COST_WRITE, limit_cost
+from app.models.reservation import Reservation
+from app.models.spend_entry import SpendEntry
 from app.models.trip import Trip
-from app.schemas.trip import TripCreate, TripOut
+from app.outbox import record_event
+from app.schemas.spend_entry import SpendCurrencyTotal, SpendSummaryOut
+from app.schemas.trip import TagFacet, TripCreate, TripDetailOut, TripListItemOut, TripOut
 
 
 router = APIRouter(
@@ -18,8 +24,43 @@ router = APIRouter(
 )
 
 
+def _split_tags(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [t.strip() for t in value.split(",") if t.strip()]
+
+
+TRIP_INCLUDES = {"reservations", "budget_categories", "spend_summary"}
+TRIP_LIST_WITH = {"counts", "spend_totals"}
+
+
+def _list_trips_cost(request: Request) -> int:
+    # per-trip aggregates (?with=) price like a summary
+    return COST_AGGREGATE if request.query_params.get("with") else COST_LIST
+
+
+def _get_trip_cost(request: Request) -> int:
+    return COST_AGGREGATE if request.query_params.get("include") else COST_READ
+
+
+def _apply_tag_filters(q, tag: Optional[str], tags_all: Optional[str], tags_any: Optional[str]):
+    # Every filter is a jsonb containment (@>) so it can use ix_trips_tags_gin
+    required = _split_tags(tags_all)
+    if tag and tag.strip():
+        required.append(tag.strip())
+
+    if required:
+        q = q.filter(Trip.tags.contains(required))
+
+    any_of = _split_tags(tags_any)
+    if any_of:
+        q = q.filter(or_(*[Trip.tags.contains([t]) for t in any_of]))
+
+    return q
+
+
 @router.post("", response_model = TripOut, status_code = 201)
-@limiter.limit("30/minute")
+@limit_cost(COST_WRITE)
 def create_trip(request: Request, payload: TripCreate, db: Session = Depends(get_db)):
     trip = Trip(
         title = payload.title,
@@ -30,24 +71,208 @@ def create_trip(request: Request, payload: TripCreate, db: Session = Depends(get
         tags = payload.tags
     )
     db.add(trip)
+    db.flush()
+    record_event(db, "created", trip)
     db.commit()
     db.refresh(trip)
     return trip
 
 
-@router.get("", response_model = List[TripOut])
-@limiter.limit("30/minute")
+def _trips_with_aggregates(db: Session, page, extras: set) -> List[TripListItemOut]:
+    """Attach per-trip aggregates to an already-paged trip subquery with LATERAL joins.
+
+    Each lateral runs once per trip on the page against the (trip_id, ...) indexes, all in one query.
+    """
+    trip = aliased(Trip, page)
+    q = db.query(trip).select_from(page)
+
+    if "counts" in extras:
+        reservation_count = (
+            select(func.count().label("n"))
+            .where(Reservation.trip_id == page.c.id)
+            .lateral("reservation_count")
+        )
+        spend_entry_count = (
+            select(func.count().label("n"))
+            .where(SpendEntry.trip_id == page.c.id)
+            .lateral("spend_entry_count")
+        )
+        q = (
+            q.add_columns(reservation_count.c.n.label("reservation_count"), spend_entry_count.c.n.label("spend_entry_count"))
+            .outerjoin(reservation_count, true())
+            .outerjoin(spend_entry_count, true())
+        )
+
+    if "spend_totals" in extras:
+        per_currency = (
+            select(SpendEntry.currency, func.sum(SpendEntry.amount).label("total"))
+            .where(SpendEntry.trip_id == page.c.id)
+            .group_by(SpendEntry.currency)
+            .correlate(page)
+            .subquery("per_currency")
+        )
+        # totals go through text so Decimal precision survives the JSON round-trip
+        spend_totals = (
+            select(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(
+                            func.jsonb_build_object(
+                                "currency", per_currency.c.currency,
+                                "total", cast(per_currency.c.total, Text),
+                            ),
+                            per_currency.c.currency,
+                        )
+                    ),
+                    func.jsonb_build_array(),
+                ).label("totals")
+            )
+            .lateral("spend_totals")
+        )
+        q = q.add_columns(spend_totals.c.totals.label("spend_totals")).outerjoin(spend_totals, true())
+
+    items = []
+    for row in q.order_by(page.c.id.desc()).all():
+        item = dict(
+            id = row[0].id,
+            title = row[0].title,
+            destination = row[0].destination,
+            start_date = row[0].start_date,
+            end_date = row[0].end_date,
+            status = row[0].status,
+            tags = row[0].tags,
+        )
+        if "counts" in extras:
+            item["reservation_count"] = row.reservation_count
+            item["spend_entry_count"] = row.spend_entry_count
+        if "spend_totals" in extras:
+            item["spend_totals"] = row.spend_totals
+        items.append(TripListItemOut(**item))
+    return items
+
+
+@router.get("", response_model = List[TripListItemOut], response_model_exclude_unset = True)
+@limit_cost(_list_trips_cost)
 def list_trips(
     request: Request,
     limit: int = Query(default = 20, ge = 1, le = 100),
     offset: int = Query(default = 0, ge = 0),
+    tag: Optional[str] = Query(default = None, description = "Only trips tagged with this tag"),
+    tags_all: Optional[str] = Query(default = None, description = "Comma-separated tags; trip must have all of them"),
+    tags_any: Optional[str] = Query(default = None, description = "Comma-separated tags; trip must have at least one"),
+    with_: Optional[str] = Query(
+        default = None,
+        alias = "with",
+        description = "Comma-separated: counts (reservations, spend entries), spend_totals (per currency)",
+    ),
+    db: Session = Depends(get_db)
+):
+    extras = set(_split_tags(with_))
+    unknown = extras - TRIP_LIST_WITH
+    if unknown:
+        raise HTTPException(status_code = 400, detail = f"Unknown with value(s): {', '.join(sorted(unknown))}")
+
+    q = _apply_tag_filters(db.query(Trip), tag, tags_all, tags_any)
+    q = q.order_by(Trip.id.desc()).offset(offset).limit(limit)
+
+    if extras:
+        return _trips_with_aggregates(db, q.subquery("page"), extras)
+
+    return q.all()
+
+
+@router.get("/tag-facets", response_model = List[TagFacet])
+@limit_cost(COST_LIST)
+def trip_tag_facets(
+    request: Request,
+    tag: Optional[str] = Query(default = None, description = "Only trips tagged with this tag"),
+    tags_all: Optional[str] = Query(default = None, description = "Comma-separated tags; trip must have all of them"),
+    tags_any: Optional[str] = Query(default = None, description = "Comma-separated tags; trip must have at least one"),
+    limit: int = Query(default = 50, ge = 1, le = 500),
     db: Session = Depends(get_db)
 ):
-    trips = (
-        db.query(Trip)
-        .order_by(Trip.id.desc())
-        .offset(offset)
+    # Same filters as list_trips, so facet counts always describe the filtered trip set.
+    # Unnesting and counting happen in one GROUP BY query.
+    filtered = _apply_tag_filters(
+        db.query(func.jsonb_array_elements_text(Trip.tags).label("tag")),
+        tag,
+        tags_all,
+        tags_any,
+    ).subquery()
+
+    trip_count = func.count().label("trip_count")
+    rows = (
+        db.query(filtered.c.tag, trip_count)
+        .group_by(filtered.c.tag)
+        .order_by(trip_count.desc(), filtered.c.tag.asc())
         .limit(limit)
         .all()
     )
-    return trips
+
+    return [TagFacet(tag = t, trip_count = n) for t, n in rows]
+
+
+def _spend_summary(db: Session, trip_id: int) -> SpendSummaryOut:
+    # count and per-currency totals in one GROUP BY
+    rows = (
+        db.query(SpendEntry.currency, func.count(SpendEntry.id), func.sum(SpendEntry.amount))
+        .filter(SpendEntry.trip_id == trip_id)
+        .group_by(SpendEntry.currency)
+        .order_by(SpendEntry.currency.asc())
+        .all()
+    )
+    return SpendSummaryOut(
+        trip_id = trip_id,
+        total_entries = sum(count for _, count, _ in rows),
+        totals_by_currency = [SpendCurrencyTotal(currency = c, total = total) for c, _, total in rows],
+    )
+
+
+@router.get("/{trip_id}", response_model = TripDetailOut, response_model_exclude_unset = True)
+@limit_cost(_get_trip_cost)
+def get_trip(
+    request: Request,
+    trip_id: int,
+    include: Optional[str] = Query(
+        default = None,
+        description = "Comma-separated: reservations, budget_categories, spend_summary",
+    ),
+    db: Session = Depends(get_db)
+):
+    includes = set(_split_tags(include))
+    unknown = includes - TRIP_INCLUDES
+    if unknown:
+        raise HTTPException(status_code = 400, detail = f"Unknown include(s): {', '.join(sorted(unknown))}")
+
+    # selectinload: one extra IN query per included collection, regardless of size (no N+1)
+    q = db.query(Trip).filter(Trip.id == trip_id)
+    if "reservations" in includes:
+        q = q.options(selectinload(Trip.reservations))
+    if "budget_categories" in includes:
+        q = q.options(selectinload(Trip.budget_categories))
+
+    trip = q.first()
+    if not trip:
+        raise HTTPException(status_code = 404, detail = "Trip not found")
+
+    detail = dict(
+        id = trip.id,
+        title = trip.title,
+        destination = trip.destination,
+        start_date = trip.start_date,
+        end_date = trip.end_date,
+        status = trip.status,
+        tags = trip.tags,
+    )
+    if "reservations" in includes:
+        # same order as the itinerary: by start time, undated last
+        detail["reservations"] = sorted(
+            trip.reservations,
+            key = lambda r: (r.start_at is None, r.start_at or 0, r.id),
+        )
+    if "budget_categories" in includes:
+        detail["budget_categories"] = sorted(trip.budget_categories, key = lambda c: c.name)
+    if "spend_summary" in includes:
+        detail["spend_summary"] = _spend_summary(db, trip_id)
+
+    return TripDetailOut(**detail)
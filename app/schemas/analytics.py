@@ -0,0 +1,34 @@
+from datetime import date
+from decimal import Decimal
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class SpendByMonthRow(BaseModel):
+    month: date
+    currency: str = Field(..., min_length=3, max_length=3, examples=["USD"])
+    total: Decimal
+    entries: int
+    trips: int
+
+
+class SpendByCategoryRow(BaseModel):
+    category_name: str = Field(..., examples=["Lodging"])
+    currency: str = Field(..., min_length=3, max_length=3, examples=["USD"])
+    total: Decimal
+    entries: int
+    trips: int
+
+
+class SpendByDestinationRow(BaseModel):
+    destination: str = Field(..., examples=["Lisbon"])
+    currency: str = Field(..., min_length=3, max_length=3, examples=["USD"])
+    total: Decimal
+    entries: int
+    trips: int
+
+
+class AnalyticsRefreshOut(BaseModel):
+    refreshed: List[str] = Field(default_factory=list)
+    duration_ms: int
@@ -0,0 +1,28 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = Field(default=None, max_length=64, description="Echoed back on the matching response")
+    method: str = Field(default="GET", description="Only GET is supported")
+    path: str = Field(..., max_length=2048, examples=["/v1/trips/1/reservations?limit=50"])
+    headers: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Extra request headers (e.g. If-None-Match); Authorization is always the batch caller's",
+    )
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
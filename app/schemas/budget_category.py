@@ -41,6 +41,7 @@ class BudgetCategoryOut(BaseModel):
     name: str
     planned_amount: Optional[Decimal]
     currency: str
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ChangeItem(BaseModel):
+    type: str = Field(..., description="reservation|spend_entry|budget_category", examples=["reservation"])
+    id: int
+    op: str = Field(..., description="upsert|delete", examples=["upsert"])
+    data: Optional[Dict[str, Any]] = Field(default=None, description="Current row for upserts; null for deletes")
+
+
+class ChangesOut(BaseModel):
+    trip_id: int
+    full_sync: bool = Field(
+        default=False,
+        description="True when no since token was given: changes hold every current row and nothing was deleted",
+    )
+    changes: List[ChangeItem] = Field(default_factory=list)
+    next_token: str = Field(..., description="Pass as ?since= on the next sync")
+    has_more: bool = Field(default=False, description="More changes are available right away with next_token")
@@ -1,9 +1,11 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any, Dict, Optional, List
 
 from pydantic import BaseModel, Field
 
+from app.timezones import is_valid_zone
+
 
 # Pydantic v1/v2 compatibility (FastAPI can be either)
 try:
@@ -107,8 +109,27 @@ class ReservationBase(BaseModel):
 
 
 class ReservationCreate(ReservationBase):
-    # same fields, but keep it explicit for readability/resume
-    pass
+    # same fields; timezone is only checked on input (stored rows may hold legacy zone names)
+    if PYDANTIC_V2:
+        @field_validator("timezone")
+        @classmethod
+        def validate_timezone(cls, v: Optional[str]) -> Optional[str]:
+            if v is None:
+                return v
+            v = v.strip()
+            if not is_valid_zone(v):
+                raise ValueError("timezone must be an IANA zone name (e.g., America/Los_Angeles)")
+            return v
+
+    else:
+        @validator("timezone")
+        def validate_timezone(cls, v: Optional[str]) -> Optional[str]:
+            if v is None:
+                return v
+            v = v.strip()
+            if not is_valid_zone(v):
+                raise ValueError("timezone must be an IANA zone name (e.g., America/Los_Angeles)")
+            return v
 
 
 class ReservationUpdate(BaseModel):
@@ -164,6 +185,16 @@ class ReservationUpdate(BaseModel):
                 raise ValueError("estimated_cost_currency must be a 3-letter code (e.g., USD)")
             return v
 
+        @field_validator("timezone")
+        @classmethod
+        def validate_timezone(cls, v: Optional[str]) -> Optional[str]:
+            if v is None:
+                return v
+            v = v.strip()
+            if not is_valid_zone(v):
+                raise ValueError("timezone must be an IANA zone name (e.g., America/Los_Angeles)")
+            return v
+
         @field_validator("end_at")
         @classmethod
         def validate_dates(cls, end_at: Optional[datetime], info):
@@ -203,6 +234,15 @@ class ReservationUpdate(BaseModel):
                 raise ValueError("estimated_cost_currency must be a 3-letter code (e.g., USD)")
             return v
 
+        @validator("timezone")
+        def validate_timezone(cls, v: Optional[str]) -> Optional[str]:
+            if v is None:
+                return v
+            v = v.strip()
+            if not is_valid_zone(v):
+                raise ValueError("timezone must be an IANA zone name (e.g., America/Los_Angeles)")
+            return v
+
         @validator("end_at")
         def validate_dates(cls, end_at: Optional[datetime], values):
             start_at = values.get("start_at")
@@ -214,6 +254,8 @@ class ReservationUpdate(BaseModel):
 class ReservationOut(ReservationBase):
     id: int
     trip_id: int
+    start_local_date: Optional[date] = None
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -228,6 +270,21 @@ class CurrencyTotal(BaseModel):
             orm_mode = True
 
 
+class ConvertedTotal(BaseModel):
+    currency: str = Field(..., min_length=3, max_length=3, examples=["EUR"])
+    total: Decimal = Field(..., examples=["1143.20"])
+    unconverted_reservations: int = Field(
+        default=0,
+        description="Reservations left out of total because no FX rate was loaded for their currency/date",
+    )
+
+    if PYDANTIC_V2:
+        model_config = ConfigDict(from_attributes=True)
+    else:
+        class Config:
+            orm_mode = True
+
+
 class ReservationSummaryOut(BaseModel):
     trip_id: int
     by_status: Dict[str, int] = Field(
@@ -245,9 +302,43 @@ class ReservationSummaryOut(BaseModel):
         description="Sum of estimated_cost_amount grouped by currency (null amounts ignored)",
         examples=[[{"currency": "USD", "total": "1240.50"}]],
     )
+    converted_total: Optional[ConvertedTotal] = Field(
+        default=None,
+        description="Estimated costs converted to ?convert_to= at each reservation's start date (today if unset)",
+    )
 
     if PYDANTIC_V2:
         model_config = ConfigDict(from_attributes=True)
     else:
         class Config:
-            orm_mode = True
\ No newline at end of file
+            orm_mode = True
+
+class ReservationConflict(BaseModel):
+    type: str
+    reservation_id: int
+    reservation_title: str
+    conflicts_with_id: int
+    conflicts_with_title: str
+    overlap_start: datetime
+    overlap_end: datetime
+
+
+class ReservationConflictsOut(BaseModel):
+    trip_id: int
+    conflicts: List[ReservationConflict] = Field(
+        default_factory=list,
+        description="Pairs of non-canceled reservations of the same type whose [start_at, end_at) overlap",
+    )
+
+
+class ItineraryDay(BaseModel):
+    date: date
+    reservations: List[ReservationOut] = Field(default_factory=list)
+
+
+class ItineraryOut(BaseModel):
+    trip_id: int
+    days: List[ItineraryDay] = Field(
+        default_factory=list,
+        description="Reservations grouped by start_at's calendar date in each reservation's own timezone",
+    )
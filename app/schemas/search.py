@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    kind: str = Field(..., description="reservation|spend_entry", examples=["reservation"])
+    id: int
+    title: Optional[str] = Field(default=None, description="Reservation title or spend entry description")
+    at: Optional[datetime] = Field(default=None, description="Reservation start_at or spend entry occurred_at")
+    rank: float
+
+
+class SearchResultsOut(BaseModel):
+    trip_id: int
+    query: str
+    items: List[SearchHit] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as ?cursor= to fetch the next page; null when there are no more results",
+    )
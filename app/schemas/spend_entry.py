@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional, List
 from pydantic import BaseModel, Field
@@ -54,6 +54,7 @@ class SpendEntryOut(BaseModel):
     created_at: datetime
     updated_at: datetime
     category_id: Optional[int]
+    version: int
 
     if PYDANTIC_V2:
         model_config = ConfigDict(from_attributes=True)
@@ -66,11 +67,64 @@ class SpendCurrencyTotal(BaseModel):
     total: Decimal = Field(..., examples=["420.50"])
 
 
+class SpendConvertedTotal(BaseModel):
+    currency: str = Field(..., min_length=3, max_length=3, examples=["EUR"])
+    total: Decimal = Field(..., examples=["388.10"])
+    unconverted_entries: int = Field(
+        default=0,
+        description="Entries left out of total because no FX rate was loaded for their currency/date",
+    )
+
+
 class SpendSummaryOut(BaseModel):
     trip_id: int
     total_entries: int = Field(..., examples=[5])
     totals_by_currency: List[SpendCurrencyTotal] = Field(default_factory=list)
+    converted_total: Optional[SpendConvertedTotal] = Field(
+        default=None,
+        description="All entries converted to ?convert_to= at each entry's occurred_at date",
+    )
+
+
+class SpendTimeseriesTotal(BaseModel):
+    currency: str = Field(..., min_length=3, max_length=3, examples=["USD"])
+    category_id: Optional[int] = None
+    total: Decimal = Field(..., examples=["84.20"])
+    entries: int = Field(..., examples=[3])
 
 
+class SpendTimeseriesBucket(BaseModel):
+    start: date = Field(..., description="First local day of the bucket")
+    total_entries: int = 0
+    totals: List[SpendTimeseriesTotal] = Field(
+        default_factory=list,
+        description="Sums by currency and category; empty for buckets with no spend",
+    )
 
 
+class SpendTimeseriesOut(BaseModel):
+    trip_id: int
+    bucket: str = Field(..., examples=["day"])
+    tz: str = Field(..., examples=["UTC"])
+    buckets: List[SpendTimeseriesBucket] = Field(default_factory=list)
+
+
+class SpendImportError(BaseModel):
+    line: int = Field(..., description="CSV line number, or transaction number for OFX", examples=[12])
+    message: str = Field(..., examples=["amount is not a number"])
+
+
+class SpendImportOut(BaseModel):
+    trip_id: int
+    rows_read: int = Field(..., examples=[1200])
+    inserted: int = Field(..., examples=[1180])
+    duplicates: int = Field(..., description="Valid rows skipped because they were already imported", examples=[15])
+    invalid: int = Field(..., examples=[5])
+    unmatched_categories: List[str] = Field(
+        default_factory=list,
+        description="Category names with no budget category on the trip (imported uncategorized)",
+    )
+    errors: List[SpendImportError] = Field(
+        default_factory=list,
+        description="First invalid rows (capped); `invalid` has the full count",
+    )
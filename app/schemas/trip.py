@@ -3,6 +3,10 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.budget_category import BudgetCategoryOut
+from app.schemas.reservation import ReservationOut
+from app.schemas.spend_entry import SpendCurrencyTotal, SpendSummaryOut
+
 
 class TripCreate(BaseModel):
     title: str = Field(min_length = 1, max_length = 120)
@@ -24,3 +28,22 @@ class TripOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TripDetailOut(TripOut):
+    # present only when requested via ?include=
+    reservations: Optional[List[ReservationOut]] = None
+    budget_categories: Optional[List[BudgetCategoryOut]] = None
+    spend_summary: Optional[SpendSummaryOut] = None
+
+
+class TripListItemOut(TripOut):
+    # present only when requested via ?with=
+    reservation_count: Optional[int] = None
+    spend_entry_count: Optional[int] = None
+    spend_totals: Optional[List[SpendCurrencyTotal]] = None
+
+
+class TagFacet(BaseModel):
+    tag: str
+    trip_count: int
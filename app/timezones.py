@@ -0,0 +1,36 @@
+from datetime import date, datetime, timezone as dt_timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str) -> ZoneInfo:
+    """Resolve an IANA zone name once per process; raises ValueError if unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def is_valid_zone(name: str) -> bool:
+    try:
+        get_zone(name)
+        return True
+    except ValueError:
+        return False
+
+
+def local_date(at: Optional[datetime], tz_name: Optional[str]) -> Optional[date]:
+    """Calendar date of `at` in `tz_name` (UTC when unset/unknown; naive datetimes are UTC)."""
+    if at is None:
+        return None
+
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=dt_timezone.utc)
+
+    zone = dt_timezone.utc
+    if tz_name and is_valid_zone(tz_name):
+        zone = get_zone(tz_name)
+
+    return at.astimezone(zone).date()
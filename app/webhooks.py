@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.config import settings
+from app.db import engine
+from app.outbox import purge_expired
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "Webhook-Signature"
+SIGNATURE_TOLERANCE_SECONDS = 300
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """Stripe-style signature: HMAC-SHA256 over "<timestamp>.<body>"."""
+    mac = hmac.new(secret.encode(), str(timestamp).encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={mac}"
+
+
+def verify(secret: str, header: str, body: bytes, now: Optional[float] = None) -> bool:
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+
+    if abs((now or time.time()) - timestamp) > SIGNATURE_TOLERANCE_SECONDS:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), header)
+
+
+def claim_batch(limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    """Lease up to limit due events; SKIP LOCKED lets several workers run side by side."""
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                """
+                UPDATE outbox_events
+                SET next_attempt_at = now() + make_interval(secs => :lease)
+                WHERE id IN (
+                    SELECT id FROM outbox_events
+                    WHERE delivered_at IS NULL
+                      AND next_attempt_at <= now()
+                      AND attempts < :max_attempts
+                    ORDER BY next_attempt_at, id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, event_type, trip_id, aggregate_type, aggregate_id, payload, created_at
+                """
+            ),
+            {"lease": lease_seconds, "max_attempts": settings.webhook_max_attempts, "limit": limit},
+        ).mappings().all()
+    return sorted((dict(row) for row in rows), key=lambda row: row["id"])
+
+
+def mark_delivered(ids: List[int]) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE outbox_events SET delivered_at = now(), last_error = NULL WHERE id = ANY(:ids)"),
+            {"ids": ids},
+        )
+
+
+def mark_failed(ids: List[int], error: str) -> None:
+    # exponential backoff with jitter, computed per row from its own attempt count
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                UPDATE outbox_events
+                SET attempts = attempts + 1,
+                    last_error = :error,
+                    next_attempt_at = now() + make_interval(
+                        secs => least(:max_delay, :base_delay * power(2, attempts)) * (0.5 + random() / 2)
+                    )
+                WHERE id = ANY(:ids)
+                """
+            ),
+            {
+                "ids": ids,
+                "error": error[:1000],
+                "base_delay": settings.webhook_backoff_base_seconds,
+                "max_delay": settings.webhook_backoff_max_seconds,
+            },
+        )
+
+
+def _envelope(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "type": row["event_type"],
+        "trip_id": row["trip_id"],
+        "aggregate_type": row["aggregate_type"],
+        "aggregate_id": row["aggregate_id"],
+        "created_at": row["created_at"].isoformat(),
+        "data": row["payload"],
+    }
+
+
+class WebhookWorker:
+    """Pushes outbox events to a webhook URL in signed, batched POSTs.
+
+    Delivery is at-least-once; receivers should dedupe on the event id.
+    """
+
+    def __init__(self, url: str, secret: str, client: Optional[httpx.AsyncClient] = None):
+        self.url = url
+        self.secret = secret
+        self.client = client or httpx.AsyncClient(timeout=settings.webhook_timeout_seconds)
+        self.batch_size = settings.webhook_batch_size
+        # a lease outlives the request timeout, so a crashed worker's batch is retried
+        self.lease_seconds = settings.webhook_timeout_seconds + 30
+
+    async def deliver_once(self) -> int:
+        """Deliver one batch; returns the number of events delivered."""
+        rows = await asyncio.to_thread(claim_batch, self.batch_size, self.lease_seconds)
+        if not rows:
+            return 0
+
+        ids = [row["id"] for row in rows]
+        body = json.dumps({"events": [_envelope(row) for row in rows]}, separators=(",", ":")).encode()
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign(self.secret, int(time.time()), body),
+        }
+
+        try:
+            response = await self.client.post(self.url, content=body, headers=headers)
+            error = None if 200 <= response.status_code < 300 else f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}"
+
+        if error is not None:
+            await asyncio.to_thread(mark_failed, ids, error)
+            logger.warning(f"Webhook delivery of {len(ids)} events failed: {error}")
+            return 0
+
+        await asyncio.to_thread(mark_delivered, ids)
+        return len(ids)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.deliver_once()
+            except Exception:
+                logger.exception("Webhook worker iteration failed")
+                delivered = 0
+
+            # keep draining while there is a backlog; otherwise poll
+            if delivered < self.batch_size:
+                await asyncio.sleep(settings.webhook_poll_interval_seconds)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def _echo_handler(secret: Optional[str], fail_rate: float):
+    class EchoHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret and not verify(secret, self.headers.get(SIGNATURE_HEADER, ""), body):
+                self.send_response(401)
+                self.end_headers()
+                return
+            if random.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            for event in json.loads(body)["events"]:
+                print(f"{event['id']} {event['type']} trip={event['trip_id']} id={event['aggregate_id']}", flush=True)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return EchoHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deliver outbox events to webhooks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("run", help="Run the delivery worker (WEBHOOK_URL / WEBHOOK_SECRET)")
+    echo = sub.add_parser("echo", help="Local stand-in receiver that verifies signatures and prints events")
+    echo.add_argument("--port", type=int, default=8099)
+    echo.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    sub.add_parser("purge", help="Delete outbox events older than OUTBOX_RETENTION_DAYS (e.g. from cron)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "purge":
+        logger.info(f"Purged {purge_expired()} outbox events")
+        return
+
+    if args.command == "echo":
+        server = HTTPServer(("127.0.0.1", args.port), _echo_handler(settings.webhook_secret, args.fail_rate))
+        logger.info(f"Webhook stand-in listening on http://127.0.0.1:{args.port}/")
+        server.serve_forever()
+        return
+
+    if not settings.webhook_url or not settings.webhook_secret:
+        parser.error("WEBHOOK_URL and WEBHOOK_SECRET must be set")
+
+    worker = WebhookWorker(settings.webhook_url, settings.webhook_secret)
+    logger.info(f"Delivering outbox events to {settings.webhook_url}")
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
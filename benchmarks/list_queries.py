@@ -0,0 +1,151 @@
+"""Per-request cost of the list_reservations / list_spend_entries queries.
+
+Compares the previous ORM Query chains with the cached prebuilt statements, each with
+psycopg server-side prepared statements on and off. Reports wall latency and client CPU
+(time.process_time) per request. Seeds a scratch trip and deletes it afterwards.
+
+    python -m benchmarks.list_queries --requests 2000
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from sqlalchemy import asc, create_engine, desc
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import RoutingSession
+from app.models.reservation import Reservation
+from app.models.spend_entry import SpendEntry
+from app.models.trip import Trip
+from app.routes.reservations import _list_reservations_stmt
+from app.routes.spend_entries import _list_spend_entries_stmt
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed(db: Session, rows: int) -> int:
+    trip = Trip(title="benchmark: list queries", tags=[])
+    db.add(trip)
+    db.flush()
+    types = ("flight", "lodging", "train", "activity")
+    for i in range(rows):
+        db.add(
+            Reservation(
+                trip_id=trip.id,
+                type=types[i % len(types)],
+                title=f"Reservation {i}",
+                start_at=START + timedelta(hours=i),
+                meta={},
+            )
+        )
+        db.add(
+            SpendEntry(
+                trip_id=trip.id,
+                amount=Decimal("12.50"),
+                currency="USD" if i % 3 else "EUR",
+                occurred_at=START + timedelta(hours=i),
+            )
+        )
+    db.commit()
+    return trip.id
+
+
+# The Query chains the routes used before the prebuilt statements (kept here as the baseline)
+def orm_reservations(db: Session, trip_id: int, i: int) -> List:
+    q = db.query(Reservation).filter(Reservation.trip_id == trip_id)
+    q = q.filter(Reservation.type == "flight")
+    q = q.filter(Reservation.start_at >= START + timedelta(hours=i % 50))
+    q = q.order_by(asc(Reservation.start_at).nulls_last(), desc(Reservation.created_at), desc(Reservation.id))
+    return q.offset(0).limit(20).all()
+
+
+def orm_spend_entries(db: Session, trip_id: int, i: int) -> List:
+    q = db.query(SpendEntry).filter(SpendEntry.trip_id == trip_id)
+    q = q.filter(SpendEntry.currency == "USD")
+    q = q.filter(SpendEntry.occurred_at >= START + timedelta(hours=i % 50))
+    q = q.order_by(desc(SpendEntry.occurred_at), desc(SpendEntry.id))
+    return q.offset(0).limit(20).all()
+
+
+def cached_reservations(db: Session, trip_id: int, i: int) -> List:
+    stmt = _list_reservations_stmt(True, False, True, False)
+    params = {"trip_id": trip_id, "type": "flight", "from_dt": START + timedelta(hours=i % 50), "offset": 0, "limit": 20}
+    return db.execute(stmt, params).scalars().all()
+
+
+def cached_spend_entries(db: Session, trip_id: int, i: int) -> List:
+    stmt = _list_spend_entries_stmt(True, False, False, True, False)
+    params = {"trip_id": trip_id, "currency": "USD", "from_dt": START + timedelta(hours=i % 50), "offset": 0, "limit": 20}
+    return db.execute(stmt, params).scalars().all()
+
+
+VARIANTS: Dict[str, Callable] = {
+    "reservations / orm query": orm_reservations,
+    "reservations / prebuilt": cached_reservations,
+    "spend entries / orm query": orm_spend_entries,
+    "spend entries / prebuilt": cached_spend_entries,
+}
+
+
+def _run(engine, trip_id: int, fn: Callable, requests: int, warmup: int) -> Dict[str, float]:
+    latencies = []
+    cpu_started = None
+    for i in range(warmup + requests):
+        if i == warmup:
+            cpu_started = time.process_time()
+        started = time.perf_counter()
+        # one session per iteration, like one request through get_db
+        with RoutingSession(bind=engine) as db:
+            fn(db, trip_id, i)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - started)
+    cpu = time.process_time() - cpu_started
+
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "cpu_us": cpu / requests * 1_000_000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=500, help="reservations and spend entries to seed")
+    args = parser.parse_args()
+
+    engines = {
+        "prepared": create_engine(
+            settings.database_url,
+            connect_args={"prepare_threshold": settings.db_prepare_threshold},
+        ),
+        "unprepared": create_engine(settings.database_url, connect_args={"prepare_threshold": None}),
+    }
+
+    with RoutingSession(bind=engines["prepared"]) as db:
+        trip_id = _seed(db, args.rows)
+
+    try:
+        print(f"{'variant':<32}{'statements':<12}{'mean ms':>10}{'p95 ms':>10}{'cpu us/req':>12}")
+        for name, fn in VARIANTS.items():
+            for mode, engine in engines.items():
+                result = _run(engine, trip_id, fn, args.requests, args.warmup)
+                print(
+                    f"{name:<32}{mode:<12}{result['mean_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['cpu_us']:>12.0f}"
+                )
+    finally:
+        with RoutingSession(bind=engines["prepared"]) as db:
+            db.query(Trip).filter(Trip.id == trip_id).delete()
+            db.commit()
+        for engine in engines.values():
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
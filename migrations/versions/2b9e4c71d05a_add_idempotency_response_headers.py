@@ -0,0 +1,27 @@
+"""add idempotency response headers
+
+Revision ID: 2b9e4c71d05a
+Revises: f48a20fd4c1d
+Create Date: 2026-10-20 09:12:40.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b9e4c71d05a'
+down_revision: Union[str, Sequence[str], None] = 'f48a20fd4c1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("idempotency_keys", sa.Column("response_headers", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "response_headers")
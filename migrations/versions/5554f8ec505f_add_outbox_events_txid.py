@@ -0,0 +1,37 @@
+"""add outbox events txid for the change feed
+
+Revision ID: 5554f8ec505f
+Revises: f40f91dae30d
+Create Date: 2026-10-19 16:48:03.274119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5554f8ec505f'
+down_revision: Union[str, Sequence[str], None] = 'f40f91dae30d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_current_xact_id() needs Postgres 13+
+    op.add_column(
+        "outbox_events",
+        sa.Column(
+            "txid",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+        ),
+    )
+    op.create_index("ix_outbox_events_trip_txid", "outbox_events", ["trip_id", "txid", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_trip_txid", table_name="outbox_events")
+    op.drop_column("outbox_events", "txid")
@@ -0,0 +1,67 @@
+"""add reservation reminders
+
+Revision ID: 589a653b3051
+Revises: 5554f8ec505f
+Create Date: 2026-10-19 17:25:41.630917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '589a653b3051'
+down_revision: Union[str, Sequence[str], None] = '5554f8ec505f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reservations_start_at_active",
+        "reservations",
+        ["start_at"],
+        postgresql_where=sa.text("start_at IS NOT NULL AND status <> 'canceled'"),
+    )
+
+    op.create_table(
+        "reservation_reminders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+
+        sa.Column(
+            "reservation_id",
+            sa.Integer(),
+            sa.ForeignKey("reservations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("offset_minutes", sa.Integer(), nullable=False),
+
+        sa.Column("remind_at", sa.DateTime(timezone=True), nullable=False),
+
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_error", sa.Text(), nullable=True),
+
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+
+    op.create_unique_constraint(
+        "uq_reservation_reminders_reservation_offset",
+        "reservation_reminders",
+        ["reservation_id", "offset_minutes"],
+    )
+    op.create_index(
+        "ix_reservation_reminders_pending",
+        "reservation_reminders",
+        ["remind_at"],
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reservation_reminders_pending", table_name="reservation_reminders")
+    op.drop_constraint("uq_reservation_reminders_reservation_offset", "reservation_reminders", type_="unique")
+    op.drop_table("reservation_reminders")
+    op.drop_index("ix_reservations_start_at_active", table_name="reservations")
@@ -0,0 +1,26 @@
+"""add outbox events created_at index for retention purges
+
+Revision ID: 6a0d3f8e2c41
+Revises: 2b9e4c71d05a
+Create Date: 2026-10-20 10:02:17.554031
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a0d3f8e2c41'
+down_revision: Union[str, Sequence[str], None] = '2b9e4c71d05a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_outbox_events_created_at", "outbox_events", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_created_at", table_name="outbox_events")
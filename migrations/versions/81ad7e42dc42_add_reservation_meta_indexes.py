@@ -0,0 +1,47 @@
+"""add reservation meta indexes
+
+Revision ID: 81ad7e42dc42
+Revises: a1f7feeb032e
+Create Date: 2026-10-19 10:48:55.104726
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81ad7e42dc42'
+down_revision: Union[str, Sequence[str], None] = 'a1f7feeb032e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Hot keys at the time of this revision (see META_HOT_KEYS in app/models/reservation.py).
+# Promoting another key later gets its own revision, same shape as below.
+HOT_KEYS = ("flight_number",)
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reservations_meta_gin",
+        "reservations",
+        ["meta"],
+        postgresql_using="gin",
+        postgresql_ops={"meta": "jsonb_path_ops"},
+    )
+
+    for key in HOT_KEYS:
+        op.create_index(
+            f"ix_reservations_trip_meta_{key}",
+            "reservations",
+            ["trip_id", sa.text(f"(meta ->> '{key}')")],
+        )
+
+
+def downgrade() -> None:
+    for key in HOT_KEYS:
+        op.drop_index(f"ix_reservations_trip_meta_{key}", table_name="reservations")
+
+    op.drop_index("ix_reservations_meta_gin", table_name="reservations")
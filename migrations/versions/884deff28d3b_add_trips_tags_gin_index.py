@@ -0,0 +1,32 @@
+"""add trips tags gin index
+
+Revision ID: 884deff28d3b
+Revises: 750f24370fff
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '884deff28d3b'
+down_revision: Union[str, Sequence[str], None] = '750f24370fff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_trips_tags_gin",
+        "trips",
+        ["tags"],
+        postgresql_using="gin",
+        postgresql_ops={"tags": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trips_tags_gin", table_name="trips")
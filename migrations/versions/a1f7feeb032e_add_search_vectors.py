@@ -0,0 +1,53 @@
+"""add search vectors to reservations and spend entries
+
+Revision ID: a1f7feeb032e
+Revises: 884deff28d3b
+Create Date: 2026-10-19 10:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f7feeb032e'
+down_revision: Union[str, Sequence[str], None] = '884deff28d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RESERVATION_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(provider, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(location_text, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'D')"
+)
+
+SPEND_ENTRY_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reservations",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(RESERVATION_DOCUMENT, persisted=True)),
+    )
+    op.create_index("ix_reservations_search_vector", "reservations", ["search_vector"], postgresql_using="gin")
+
+    op.add_column(
+        "spend_entries",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SPEND_ENTRY_DOCUMENT, persisted=True)),
+    )
+    op.create_index("ix_spend_entries_search_vector", "spend_entries", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_spend_entries_search_vector", table_name="spend_entries")
+    op.drop_column("spend_entries", "search_vector")
+    op.drop_index("ix_reservations_search_vector", table_name="reservations")
+    op.drop_column("reservations", "search_vector")
@@ -0,0 +1,40 @@
+"""add fx rates
+
+Revision ID: b4f46b1d1a30
+Revises: d3783bd17bf3
+Create Date: 2026-10-19 13:05:49.227381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f46b1d1a30'
+down_revision: Union[str, Sequence[str], None] = 'd3783bd17bf3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fx_rates",
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("rate_date", sa.Date(), nullable=False),
+        sa.Column("rate", sa.Numeric(18, 8), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("currency", "rate_date"),
+    )
+
+    op.create_check_constraint(
+        "ck_fx_rates_rate_positive",
+        "fx_rates",
+        "rate > 0",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_fx_rates_rate_positive", "fx_rates", type_="check")
+    op.drop_table("fx_rates")
@@ -0,0 +1,56 @@
+"""add reservation period index
+
+Revision ID: bb8f0eeffa50
+Revises: 81ad7e42dc42
+Create Date: 2026-10-19 11:37:02.640193
+
+Pass -x reservation_exclusion=true to also add an exclusion constraint that
+rejects overlapping lodging/flight reservations on the same trip:
+
+    python -m alembic -x reservation_exclusion=true upgrade head
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb8f0eeffa50'
+down_revision: Union[str, Sequence[str], None] = '81ad7e42dc42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PERIOD = "tstzrange(start_at, end_at, '[)')"
+ACTIVE = "start_at IS NOT NULL AND end_at IS NOT NULL AND status <> 'canceled'"
+
+
+def _exclusion_enabled() -> bool:
+    value = context.get_x_argument(as_dictionary=True).get("reservation_exclusion", "")
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.create_index(
+        "ix_reservations_trip_type_period",
+        "reservations",
+        ["trip_id", "type", sa.text(PERIOD)],
+        postgresql_using="gist",
+        postgresql_where=sa.text(ACTIVE),
+    )
+
+    if _exclusion_enabled():
+        op.execute(
+            "ALTER TABLE reservations ADD CONSTRAINT ex_reservations_no_overlap "
+            f"EXCLUDE USING gist (trip_id WITH =, type WITH =, {PERIOD} WITH &&) "
+            f"WHERE ({ACTIVE} AND type IN ('lodging', 'flight'))"
+        )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE reservations DROP CONSTRAINT IF EXISTS ex_reservations_no_overlap")
+    op.drop_index("ix_reservations_trip_type_period", table_name="reservations")
@@ -0,0 +1,31 @@
+"""add row versions for optimistic concurrency
+
+Revision ID: bf5e2dc446e1
+Revises: 7c503cc8e033
+Create Date: 2026-10-19 15:51:20.736105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bf5e2dc446e1'
+down_revision: Union[str, Sequence[str], None] = '7c503cc8e033'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("reservations", "spend_entries", "budget_categories")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "version")
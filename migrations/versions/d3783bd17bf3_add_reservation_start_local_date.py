@@ -0,0 +1,48 @@
+"""add reservation start local date
+
+Revision ID: d3783bd17bf3
+Revises: bb8f0eeffa50
+Create Date: 2026-10-19 12:20:36.981457
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3783bd17bf3'
+down_revision: Union[str, Sequence[str], None] = 'bb8f0eeffa50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("reservations", sa.Column("start_local_date", sa.Date(), nullable=True))
+
+    # Backfill existing rows; the app maintains the column on write from here on.
+    # Unknown zone names fall back to UTC, same as app.timezones.local_date.
+    op.execute(
+        """
+        UPDATE reservations
+        SET start_local_date = (
+            start_at AT TIME ZONE CASE
+                WHEN timezone IN (SELECT name FROM pg_timezone_names) THEN timezone
+                ELSE 'UTC'
+            END
+        )::date
+        WHERE start_at IS NOT NULL
+        """
+    )
+
+    op.create_index(
+        "ix_reservations_trip_start_local_date",
+        "reservations",
+        ["trip_id", "start_local_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reservations_trip_start_local_date", table_name="reservations")
+    op.drop_column("reservations", "start_local_date")
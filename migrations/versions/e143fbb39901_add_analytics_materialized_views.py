@@ -0,0 +1,74 @@
+"""add analytics materialized views
+
+Revision ID: e143fbb39901
+Revises: b4f46b1d1a30
+Create Date: 2026-10-19 14:11:08.473529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e143fbb39901'
+down_revision: Union[str, Sequence[str], None] = 'b4f46b1d1a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Each view needs a unique index so it can be refreshed CONCURRENTLY.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_spend_by_month AS
+        SELECT
+            date_trunc('month', se.occurred_at AT TIME ZONE 'UTC')::date AS month,
+            se.currency,
+            sum(se.amount) AS total,
+            count(*) AS entries,
+            count(DISTINCT se.trip_id) AS trips
+        FROM spend_entries se
+        GROUP BY 1, 2
+        """
+    )
+    op.create_index("ux_mv_spend_by_month", "mv_spend_by_month", ["month", "currency"], unique=True)
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_spend_by_category AS
+        SELECT
+            coalesce(bc.name, 'Uncategorized') AS category_name,
+            se.currency,
+            sum(se.amount) AS total,
+            count(*) AS entries,
+            count(DISTINCT se.trip_id) AS trips
+        FROM spend_entries se
+        LEFT JOIN budget_categories bc ON bc.id = se.category_id
+        GROUP BY 1, 2
+        """
+    )
+    op.create_index("ux_mv_spend_by_category", "mv_spend_by_category", ["category_name", "currency"], unique=True)
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_spend_by_destination AS
+        SELECT
+            coalesce(t.destination, 'Unknown') AS destination,
+            se.currency,
+            sum(se.amount) AS total,
+            count(*) AS entries,
+            count(DISTINCT se.trip_id) AS trips
+        FROM spend_entries se
+        JOIN trips t ON t.id = se.trip_id
+        GROUP BY 1, 2
+        """
+    )
+    op.create_index("ux_mv_spend_by_destination", "mv_spend_by_destination", ["destination", "currency"], unique=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_destination")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_category")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_month")
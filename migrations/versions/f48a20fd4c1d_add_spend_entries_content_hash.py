@@ -0,0 +1,34 @@
+"""add spend entries content hash for ledger imports
+
+Revision ID: f48a20fd4c1d
+Revises: 589a653b3051
+Create Date: 2026-10-19 18:04:12.881406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f48a20fd4c1d'
+down_revision: Union[str, Sequence[str], None] = '589a653b3051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("spend_entries", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ux_spend_entries_trip_content_hash",
+        "spend_entries",
+        ["trip_id", "content_hash"],
+        unique=True,
+        postgresql_where=sa.text("content_hash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_spend_entries_trip_content_hash", table_name="spend_entries")
+    op.drop_column("spend_entries", "content_hash")
@@ -0,0 +1,208 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app import admission
+from app.admission import EXEMPT, LOW, NORMAL, AdmissionController, DecayingAverage, admission_class
+from app.config import settings
+from app.db import WaitTimingQueuePool
+from app.middleware import admission as admission_middleware
+from app.middleware.admission import AdmissionControlMiddleware
+
+HALF_LIFE = 10.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def wait(clock):
+    return DecayingAverage(HALF_LIFE, clock=clock)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    monkeypatch.setattr(settings, "admission_max_in_flight", 4)
+    monkeypatch.setattr(settings, "admission_low_max_in_flight", 2)
+    monkeypatch.setattr(settings, "admission_low_wait_ms", 50.0)
+    monkeypatch.setattr(settings, "admission_shed_wait_ms", 1000.0)
+    monkeypatch.setattr(settings, "admission_retry_after_seconds", 7)
+
+
+def test_average_blends_then_halves_every_half_life(wait, clock):
+    wait.observe(1.0)
+    assert wait.value() == pytest.approx(0.2)
+
+    clock.advance(HALF_LIFE)
+    assert wait.value() == pytest.approx(0.1)
+    clock.advance(HALF_LIFE)
+    assert wait.value() == pytest.approx(0.05)
+
+    # a new observation blends with the decayed value, not the stale one
+    wait.observe(1.0)
+    assert wait.value() == pytest.approx(0.05 + 0.2 * 0.95)
+
+
+def test_average_does_not_grow_if_the_clock_steps_back(wait, clock):
+    wait.observe(1.0)
+    clock.advance(-5)
+
+    assert wait.value() == pytest.approx(0.2)
+
+
+def test_low_sheds_on_a_shorter_wait_than_normal(limits, wait, clock):
+    controller = AdmissionController(wait)
+
+    wait.observe(0.5)  # 100ms: over the LOW threshold only
+    assert controller.try_admit(LOW) == (False, "pool_wait")
+    assert controller.try_admit(NORMAL) == (True, None)
+    assert controller.saturation() is None
+    controller.release(NORMAL)
+
+    wait.observe(10.0)  # ~2s: everything sheds
+    assert controller.try_admit(NORMAL) == (False, "pool_wait")
+    assert controller.try_admit(LOW) == (False, "pool_wait")
+    assert controller.saturation() == "pool_wait"
+
+    # with no new samples the wait decays and traffic is let back in
+    clock.advance(HALF_LIFE * 10)
+    assert controller.try_admit(LOW) == (True, None)
+    assert controller.try_admit(NORMAL) == (True, None)
+    assert controller.in_flight() == 2
+
+
+def test_in_flight_caps(limits, wait):
+    controller = AdmissionController(wait)
+
+    assert controller.try_admit(LOW) == (True, None)
+    assert controller.try_admit(LOW) == (True, None)
+    assert controller.try_admit(LOW) == (False, "in_flight")
+
+    assert controller.try_admit(NORMAL) == (True, None)
+    assert controller.try_admit(NORMAL) == (True, None)
+    assert controller.try_admit(NORMAL) == (False, "in_flight")
+    assert controller.saturation() == "in_flight"
+    assert (controller.in_flight(LOW), controller.in_flight(NORMAL)) == (2, 2)
+
+    controller.release(LOW)
+    assert controller.saturation() is None
+    assert controller.try_admit(NORMAL) == (True, None)
+
+
+router = APIRouter()
+
+
+@router.get("/normal")
+def normal_route():
+    return {}
+
+
+@router.get("/low")
+@admission_class(LOW)
+def low_route():
+    return {}
+
+
+@router.get("/stream")
+@admission_class(EXEMPT)
+def stream_route():
+    return {}
+
+
+@router.get("/health")
+def health():
+    return {}
+
+
+app = FastAPI()
+app.include_router(router)
+app.add_middleware(AdmissionControlMiddleware, routers=[router])
+
+
+@pytest.fixture
+def client(monkeypatch, limits, wait):
+    controller = AdmissionController(wait)
+    monkeypatch.setattr(admission_middleware, "controller", controller)
+    return TestClient(app), controller
+
+
+def test_middleware_sheds_by_route_class(client, wait):
+    client, controller = client
+    wait.observe(0.5)
+
+    resp = client.get("/low")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    assert "pool_wait" in resp.json()["detail"]
+    assert client.get("/normal").status_code == 200
+    assert controller.in_flight() == 0
+
+
+def test_middleware_exemptions_pass_when_saturated(client, wait, monkeypatch):
+    client, controller = client
+    wait.observe(10.0)
+
+    assert client.get("/normal").status_code == 503
+    assert client.get("/stream").status_code == 200
+    assert client.get("/health").status_code == 200
+
+    monkeypatch.setattr(settings, "admission_enabled", False)
+    assert client.get("/normal").status_code == 200
+    assert controller.in_flight() == 0
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Observations(list):
+    def observe(self, value: float) -> None:
+        self.append(value)
+
+
+def test_pool_reports_queueing_but_not_connect_time(clock, monkeypatch):
+    def connect():
+        clock.advance(5.0)  # a slow TCP/TLS/auth handshake
+        return FakeConnection()
+
+    pool = WaitTimingQueuePool(connect, pool_size=1, max_overflow=0)
+    pool.clock = clock
+    pool.wait_average = observed = Observations()
+
+    conn = pool.connect()
+    conn.close()
+    assert observed == [0.0]
+
+    queue_get = pool._pool.get
+
+    def slow_get(*args, **kwargs):
+        clock.advance(2.0)  # another checkout held the only connection
+        return queue_get(*args, **kwargs)
+
+    monkeypatch.setattr(pool._pool, "get", slow_get)
+    pool.connect().close()
+
+    assert observed == [0.0, 2.0]
+
+
+def test_default_controller_reads_the_pool_wait():
+    assert admission.controller._wait is admission.pool_wait
+    assert WaitTimingQueuePool.wait_average is admission.pool_wait
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.deps import get_db
+from app.main import app
+from app.middleware.rate_limit import limiter
+from app.routes.batch import _validate
+from app.schemas.batch import BatchSubRequest
+
+AUTH = {"Authorization": "Bearer test-key"}
+
+
+@pytest.fixture
+def client():
+    def broken_db():
+        raise RuntimeError("database is down")
+
+    limiter.enabled = False
+    app.dependency_overrides[get_db] = broken_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        limiter.enabled = True
+
+
+def test_unhandled_sub_request_error_stays_in_its_item(client):
+    resp = client.post(
+        "/v1/batch",
+        json={"requests": [{"id": "a", "path": "/v1/nope"}, {"id": "b", "path": "/v1/trips/1"}]},
+        headers=AUTH,
+    )
+
+    assert resp.status_code == 200
+    items = {item["id"]: item for item in resp.json()["responses"]}
+    assert items["a"]["status"] == 404
+    assert items["b"]["status"] == 500
+
+
+def test_sub_request_path_is_percent_decoded():
+    path, raw_path, query = _validate(BatchSubRequest(path="/v1/trips/tag%2Dfacets?limit=5"))
+
+    assert path == "/v1/trips/tag-facets"
+    assert raw_path == "/v1/trips/tag%2Dfacets"
+    assert query == "limit=5"
+
+
+def test_encoded_nested_batch_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        _validate(BatchSubRequest(path="/v1/%62atch"))
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,55 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.routes.changes import MAX_EVENT_ID, _decode_token, _encode_token, _parse_since
+
+
+def _raw_token(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_token_roundtrips():
+    token = _encode_token(812, MAX_EVENT_ID, 1_700_000_000)
+
+    assert "=" not in token
+    assert _decode_token(token) == (812, MAX_EVENT_ID, 1_700_000_000)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a token",
+        "%%%%",
+        "é",
+        _raw_token({"txid": 1}),
+        _raw_token([1, 2]),
+        _raw_token([1, 2, 3, 4]),
+        _raw_token(["a", 2, 3]),
+        _raw_token([1, None, 3]),
+        _raw_token([1, 2, 1e400]),
+        _raw_token([-1, 2, 3]),
+        _raw_token([2**64, 2, 3]),
+    ],
+)
+def test_malformed_token_is_400(token):
+    with pytest.raises(HTTPException) as excinfo:
+        _parse_since(token)
+
+    assert excinfo.value.status_code == 400
+
+
+def test_expired_token_is_410():
+    issued_at = 1_700_000_000
+    token = _encode_token(5, 6, issued_at)
+    retention = settings.outbox_retention_days * 86400
+
+    assert _parse_since(token, now=issued_at + retention) == (5, 6, issued_at)
+    with pytest.raises(HTTPException) as excinfo:
+        _parse_since(token, now=issued_at + retention + 1)
+
+    assert excinfo.value.status_code == 410
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.coalesce import SingleFlight, coalesce
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+    roles = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"total": 3}
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", compute, roles.append) for _ in range(10)))
+
+    results = run(main())
+
+    assert len(calls) == 1
+    assert results == [{"total": 3}] * 10
+    assert roles.count(False) == 1 and roles.count(True) == 9
+
+
+def test_different_keys_do_not_share():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        return await asyncio.gather(flights.do("a", lambda: compute("a")), flights.do("b", lambda: compute("b")))
+
+    assert run(main()) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_leader_exception_is_raised_in_every_caller():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        raise LookupError("trip not found")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", compute) for _ in range(3)), return_exceptions=True)
+
+    results = run(main())
+
+    assert all(isinstance(r, LookupError) for r in results)
+
+
+def test_nothing_is_cached_after_the_flight_lands():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await flights.do("k", compute), await flights.do("k", compute)]
+
+    assert run(main()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("k", compute))
+        follower = asyncio.ensure_future(flights.do("k", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(main()) == "done"
+
+
+def test_decorated_sync_route_runs_once_off_the_event_loop():
+    threads = set()
+    started = threading.Event()
+
+    @coalesce
+    def summary(trip_id: int):
+        threads.add(threading.get_ident())
+        started.wait(1)
+        return {"trip_id": trip_id}
+
+    async def main():
+        calls = [asyncio.ensure_future(summary(trip_id=1)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        started.set()
+        return await asyncio.gather(*calls)
+
+    assert run(main()) == [{"trip_id": 1}] * 5
+    assert len(threads) == 1 and threading.get_ident() not in threads
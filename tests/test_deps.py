@@ -0,0 +1,29 @@
+import pytest
+from fastapi import HTTPException
+
+from app.deps import bulk_ids, if_match_version
+
+
+def test_bulk_ids_dedupes_in_request_order():
+    assert bulk_ids("12, 7,12,,31") == [12, 7, 31]
+
+
+@pytest.mark.parametrize("ids", ["1,²", "1,x", ",", "-3"])
+def test_bulk_ids_rejects_non_integers(ids):
+    with pytest.raises(HTTPException) as excinfo:
+        bulk_ids(ids)
+
+    assert excinfo.value.status_code == 400
+
+
+def test_if_match_reads_weak_and_strong_etags():
+    assert if_match_version('W/"3"') == 3
+    assert if_match_version('"3"') == 3
+    assert if_match_version("*") is None
+
+
+def test_if_match_rejects_non_ascii_digits():
+    with pytest.raises(HTTPException) as excinfo:
+        if_match_version('"²"')
+
+    assert excinfo.value.status_code == 400
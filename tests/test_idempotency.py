@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from starlette.responses import Response
+
+from app.main import app
+from app.middleware.idempotency import _replay, _replayed_headers
+
+
+def test_non_ascii_bearer_token_falls_through_to_401():
+    resp = TestClient(app).post(
+        "/v1/trips",
+        json={"title": "x"},
+        headers={"Authorization": "Bearer clé".encode("latin-1"), "Idempotency-Key": "k1"},
+    )
+
+    assert resp.status_code == 401
+
+
+def test_replay_repeats_stored_headers_including_repeated_cookies():
+    original = Response(content=b"{}", status_code=201, media_type="application/json")
+    original.set_cookie("a", "1")
+    original.set_cookie("b", "2")
+    original.headers["X-Read-Primary-Until"] = "1700000000.000"
+    original.headers["RateLimit-Remaining"] = "7"
+
+    headers = _replayed_headers(original)
+    stored = ("hash", 201, "application/json", "{}", datetime.now(timezone.utc), headers)
+    replayed = _replay(stored, "hash")
+
+    assert [v for k, v in replayed.raw_headers if k == b"set-cookie"] == [
+        v for k, v in original.raw_headers if k == b"set-cookie"
+    ]
+    assert replayed.headers["x-read-primary-until"] == "1700000000.000"
+    assert "ratelimit-remaining" not in replayed.headers
+    assert replayed.headers["idempotent-replayed"] == "true"
+
+
+def test_replay_with_a_different_request_is_rejected():
+    stored = ("hash", 201, "application/json", "{}", datetime.now(timezone.utc), [])
+
+    assert _replay(stored, "other").status_code == 422
@@ -0,0 +1,155 @@
+import io
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.ledger_import import READ_CHUNK_SIZE, ImportErrors, _parse_amount, parse_csv, parse_ofx
+
+
+@pytest.mark.parametrize(
+    "raw,negate,expected",
+    [
+        ("12.345", False, Decimal("12.34")),
+        ("$1,234.50", False, Decimal("1234.50")),
+        ("€ 7", False, Decimal("7.00")),
+        ("(12.34)", False, Decimal("-12.34")),
+        ("-12.34", True, Decimal("12.34")),
+        ("12.34", True, Decimal("-12.34")),
+    ],
+)
+def test_parse_amount(raw, negate, expected):
+    assert _parse_amount(raw, negate) == expected
+
+
+@pytest.mark.parametrize("raw", [None, "", "abc", "1.2.3", "NaN", "Infinity", "1e400", "-1e400", "1e26"])
+def test_parse_amount_rejects_non_numbers(raw):
+    with pytest.raises(ValueError, match="amount is not a number"):
+        _parse_amount(raw, False)
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def test_parse_csv_maps_aliases_and_collects_errors():
+    raw = _csv(
+        "\ufeffDate,Amount,Payee,Category,Reference\n"
+        "2026-01-02,12.50,Cafe,Food,T1\n"
+        "\n"
+        "01/03/2026,1e400,Hotel,,T2\n"
+        "someday,3,Taxi,,T3\n"
+        "2026-01-04T09:30Z,(4),Refund,,T4\n"
+    )
+    errors = ImportErrors()
+
+    rows = list(parse_csv(raw, "usd", "Europe/Paris", False, errors))
+
+    assert [(r[0], r[2], r[3], r[4], r[5]) for r in rows] == [
+        (2, Decimal("12.50"), "USD", "Cafe", "Food"),
+        (6, Decimal("-4.00"), "USD", "Refund", None),
+    ]
+    # date-only values are local to the statement's timezone
+    assert rows[0][1] == datetime(2026, 1, 1, 23, tzinfo=timezone.utc)
+    assert rows[1][1] == datetime(2026, 1, 4, 9, 30, tzinfo=timezone.utc)
+    assert errors.count == 2
+    assert [e["line"] for e in errors.items] == [4, 5]
+    assert errors.items[0]["message"] == "amount is not a number"
+
+
+def test_parse_csv_content_hash_is_stable():
+    text = "date,amount,description,id\n2026-01-02,5,Cafe,T1\n"
+
+    first = list(parse_csv(_csv(text), "USD", "UTC", False, ImportErrors()))
+    second = list(parse_csv(_csv(text), "USD", "UTC", False, ImportErrors()))
+    other = list(parse_csv(_csv(text.replace("T1", "T2")), "USD", "UTC", False, ImportErrors()))
+
+    assert first[0][7] == second[0][7]
+    assert first[0][7] != other[0][7]
+
+
+def test_parse_csv_requires_date_and_amount_columns():
+    with pytest.raises(ValueError, match="occurred_at"):
+        list(parse_csv(_csv("amount,description\n1,x\n"), "USD", "UTC", False, ImportErrors()))
+
+
+def test_parse_csv_empty_file_yields_nothing():
+    assert list(parse_csv(_csv(""), "USD", "UTC", False, ImportErrors())) == []
+
+
+def test_parse_csv_errors_keep_only_the_first_messages():
+    body = "".join(f"2026-01-02,x{i}\n" for i in range(5))
+    errors = ImportErrors(limit=2)
+
+    assert list(parse_csv(_csv("date,amount\n" + body), "USD", "UTC", False, errors)) == []
+    assert errors.count == 5
+    assert len(errors.items) == 2
+
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260102120000[-5:EST]
+<TRNAMT>-42.10
+<FITID>A1
+<NAME>Museum
+<MEMO>tickets
+</STMTTRN>
+<STMTTRN>
+<DTPOSTED>20260103
+<TRNAMT>1e400
+<FITID>A2
+</STMTTRN>
+<STMTTRN>
+<DTPOSTED>yesterday
+<TRNAMT>3
+<FITID>A3
+</STMTTRN>
+<STMTTRN>
+<DTPOSTED>20260104
+<TRNAMT>-8
+<CURRENCY>GBP
+<FITID>A4
+<MEMO>Train
+</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_parse_ofx_sgml():
+    errors = ImportErrors()
+
+    rows = list(parse_ofx(io.BytesIO(OFX_SGML.encode()), "USD", True, errors))
+
+    assert [(r[0], r[2], r[3], r[4], r[6]) for r in rows] == [
+        (1, Decimal("42.10"), "EUR", "Museum", "tickets"),
+        (4, Decimal("8.00"), "GBP", "Train", None),
+    ]
+    assert rows[0][1] == datetime(2026, 1, 2, 12, tzinfo=timezone(timedelta(hours=-5)))
+    assert rows[1][1] == datetime(2026, 1, 4, tzinfo=timezone.utc)
+    assert errors.count == 2
+    assert [(e["line"], e["message"]) for e in errors.items] == [
+        (2, "amount is not a number"),
+        (3, "DTPOSTED is not an OFX date"),
+    ]
+
+
+def test_parse_ofx_xml_across_read_chunks():
+    # pad so the transaction straddles the chunk boundary of the tokenizer
+    padding = "<!--" + "x" * (READ_CHUNK_SIZE - 10) + "-->"
+    xml = (
+        f"<OFX>{padding}<CURDEF>USD</CURDEF>"
+        "<STMTTRN><DTPOSTED>20260105</DTPOSTED><TRNAMT>19.99</TRNAMT>"
+        "<FITID>X1</FITID><NAME>Dinner</NAME></STMTTRN></OFX>"
+    )
+    errors = ImportErrors()
+
+    rows = list(parse_ofx(io.BytesIO(xml.encode()), "EUR", False, errors))
+
+    assert [(r[2], r[3], r[4]) for r in rows] == [(Decimal("19.99"), "USD", "Dinner")]
+    assert errors.count == 0
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DBAPIError, OperationalError
+from starlette.requests import Request
+
+from app.main import app
+from app.query_budget import LOCK_NOT_AVAILABLE, QUERY_CANCELED, query_timeout_handler
+
+
+class FakeDriverError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def list_trips():
+    pass
+
+
+def _handle(sqlstate):
+    request = Request({"type": "http", "path": "/v1/trips", "headers": [], "endpoint": list_trips})
+    exc = OperationalError("SELECT 1", {}, FakeDriverError(sqlstate))
+    return asyncio.run(query_timeout_handler(request, exc))
+
+
+@pytest.mark.parametrize(
+    "sqlstate,status,retry_after",
+    [(QUERY_CANCELED, 504, None), (LOCK_NOT_AVAILABLE, 503, "1"), ("08006", 500, None), (None, 500, None)],
+)
+def test_timeouts_map_to_gateway_errors_and_the_rest_to_500(sqlstate, status, retry_after):
+    resp = _handle(sqlstate)
+
+    assert resp.status_code == status
+    assert resp.headers.get("Retry-After") == retry_after
+
+
+def test_handler_is_registered_for_operational_errors_only():
+    assert app.exception_handlers[OperationalError] is query_timeout_handler
+    assert DBAPIError not in app.exception_handlers
@@ -0,0 +1,169 @@
+import hashlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
+
+from app.config import settings
+from app.middleware.rate_limit import (
+    COST_AGGREGATE,
+    COST_LIST,
+    COST_READ,
+    COST_WRITE,
+    RateLimitHeadersMiddleware,
+    budget_per_minute,
+    limit_cost,
+    limiter,
+)
+from app.routes.trips import _get_trip_cost, _list_trips_cost
+
+BUDGET = 10
+
+
+def _bearer(key: str) -> dict:
+    return {"Authorization": f"Bearer {key}"}
+
+
+# Wired like app.main, with a handful of routes priced like the real ones. Built once: the
+# limiter registers limits per decorated function name, so a second copy would charge twice
+app = FastAPI()
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+
+
+@app.post("/trips")
+@limit_cost(COST_WRITE)
+def create_trip(request: Request):
+    return {}
+
+
+@app.get("/trips")
+@limit_cost(_list_trips_cost)
+def list_trips(request: Request):
+    return []
+
+
+@app.get("/trips/{trip_id}")
+@limit_cost(_get_trip_cost)
+def get_trip(request: Request, trip_id: int):
+    return {}
+
+
+@app.get("/health")
+def health():
+    return {}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # the limiter uses slowapi's default in-memory storage here
+    monkeypatch.setattr(settings, "rate_limit_per_minute", BUDGET)
+    monkeypatch.setattr(settings, "rate_limit_tiers", {"bulk": 50})
+    monkeypatch.setattr(settings, "rate_limit_key_tiers", {})
+    limiter.enabled = True
+    limiter.reset()
+    try:
+        yield TestClient(app)
+    finally:
+        limiter.reset()
+
+
+def _remaining(resp) -> int:
+    return int(resp.headers["RateLimit-Remaining"])
+
+
+def test_costs_are_charged_against_one_shared_budget(client):
+    headers = _bearer("key-a")
+    charges = [
+        (client.post("/trips", headers=headers), COST_WRITE),
+        (client.get("/trips", headers=headers), COST_LIST),
+        (client.get("/trips", params={"with": "spend_summary"}, headers=headers), COST_AGGREGATE),
+        (client.get("/trips/1", headers=headers), COST_READ),
+    ]
+
+    spent = 0
+    for resp, cost in charges:
+        spent += cost
+        assert resp.status_code in (200, 201)
+        assert resp.headers["RateLimit-Limit"] == str(BUDGET)
+        assert _remaining(resp) == BUDGET - spent
+
+    assert spent == BUDGET
+    assert client.get("/trips/1", headers=headers).status_code == 429
+
+
+def test_callable_costs_follow_the_query():
+    def request(query: bytes) -> Request:
+        return Request({"type": "http", "query_string": query, "headers": []})
+
+    assert _list_trips_cost(request(b"")) == COST_LIST
+    assert _list_trips_cost(request(b"with=spend_summary")) == COST_AGGREGATE
+    assert _get_trip_cost(request(b"")) == COST_READ
+    assert _get_trip_cost(request(b"include=reservations")) == COST_AGGREGATE
+
+
+def test_each_key_has_its_own_budget(client):
+    for _ in range(BUDGET // COST_WRITE):
+        assert client.post("/trips", headers=_bearer("key-a")).status_code == 200
+
+    assert client.post("/trips", headers=_bearer("key-a")).status_code == 429
+    resp = client.post("/trips", headers=_bearer("key-b"))
+    assert resp.status_code == 200
+    assert _remaining(resp) == BUDGET - COST_WRITE
+
+
+def test_tier_is_looked_up_by_key_hash(client, monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "rate_limit_key_tiers",
+        {
+            hashlib.sha256(b"bulk-key").hexdigest(): "bulk",
+            hashlib.sha256(b"lost-key").hexdigest(): "retired",
+            # a raw key in config does nothing
+            "plain-key": "bulk",
+        },
+    )
+
+    assert budget_per_minute("bulk-key") == 50
+    assert budget_per_minute("lost-key") == BUDGET
+    assert budget_per_minute("plain-key") == BUDGET
+
+    resp = client.get("/trips/1", headers=_bearer("bulk-key"))
+    assert resp.headers["RateLimit-Limit"] == "50"
+    assert resp.headers["RateLimit-Policy"] == "50;w=60"
+    assert _remaining(resp) == 50 - COST_READ
+
+
+def test_headers_and_retry_after_on_429(client):
+    headers = _bearer("key-a")
+    resp = client.get("/trips/1", headers=headers)
+    assert resp.headers["RateLimit-Policy"] == f"{BUDGET};w=60"
+    assert 0 <= int(resp.headers["RateLimit-Reset"]) <= 60
+    assert "Retry-After" not in resp.headers
+
+    for _ in range(BUDGET - COST_READ):
+        client.get("/trips/1", headers=headers)
+    resp = client.get("/trips/1", headers=headers)
+
+    assert resp.status_code == 429
+    assert resp.headers["RateLimit-Limit"] == str(BUDGET)
+    assert _remaining(resp) == 0
+    assert 1 <= int(resp.headers["Retry-After"]) <= 60
+
+
+def test_unbudgeted_routes_and_disabled_limiter_send_no_headers(client):
+    assert "RateLimit-Limit" not in client.get("/health").headers
+
+    limiter.enabled = False
+    try:
+        resp = client.get("/trips/1", headers=_bearer("key-a"))
+    finally:
+        limiter.enabled = True
+
+    assert resp.status_code == 200
+    assert "RateLimit-Limit" not in resp.headers